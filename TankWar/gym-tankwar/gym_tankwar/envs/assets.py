@@ -2,7 +2,6 @@
 
 import os
 
-import numpy as np
 import pygame
 from PIL import Image
 
@@ -11,274 +10,148 @@ from PIL import Image
 images_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
 audios_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "audios")
 
+# Loaded images shared by all movables so that new movables never touch the disk
+_surfs_cache = {}
 
-class _Movable(pygame.sprite.Sprite):
-    # Max. speed is the player's bullet's speed in 15-FPS mode
-    max_speed = 14
+# Surfaces with the pixel formats of the canvas with and without per-pixel alpha
+_alpha_format = pygame.Surface((1, 1), pygame.SRCALPHA, 32)
+_opaque_format = pygame.Surface((1, 1))
 
-    def __init__(
-            self,
-            window_width: int,
-            window_height: int,
-            start_x: int,
-            start_y: int,
-            start_angle: int,
-            speed: int,
-            image_path: str,
-            resize_ratio: float = 1.0) -> None:
-        super().__init__()
 
-        self.window_width = window_width
-        self.window_height = window_height
-        self.angle = start_angle
-        self.speed = speed
+def _convert(surf: pygame.Surface) -> pygame.Surface:
+    """
+    A function that converts a Surface to the pixel format of the canvas 
+    so that it is blitted without per-pixel format conversion. The Surface 
+    is returned as it is if the display module is not initialized.
+    """
+
+    if not pygame.display.get_init():
+        return surf
+
+    if surf.get_flags() & pygame.SRCALPHA or surf.get_colorkey() is not None:
+        return surf.convert(_alpha_format)
+
+    return surf.convert(_opaque_format)
 
+
+def _load_surfs(image_path: str, resize_ratio: float,
+                scale: float = 1.0) -> dict[int, pygame.Surface]:
+    """
+    A function that loads and resizes an image once for a rendering scale 
+    and returns its rotated Surfaces for all possible angles.
+    """
+
+    key = (image_path, resize_ratio, scale, pygame.display.get_init())
+    if key not in _surfs_cache:
         # Load the image and convert it into a Surface
-        self.surf = pygame.image.load(image_path)
+        surf = pygame.image.load(image_path)
 
         # Set the background to transparent
-        self.surf.set_alpha(256)
+        surf.set_alpha(256)
 
         # Resize the image
-        self.surf = pygame.transform.scale(
-            self.surf,
+        surf = pygame.transform.scale(
+            surf,
             (
-                self.surf.get_width() / resize_ratio,
-                self.surf.get_height() / resize_ratio,
+                surf.get_width() / resize_ratio * scale,
+                surf.get_height() / resize_ratio * scale,
             ),
         )
+        surf = _convert(surf)
 
         # Rotate the image
-        self.surf = pygame.transform.rotate(self.surf, self.angle)
+        _surfs_cache[key] = {
+            angle: pygame.transform.rotate(surf, angle)
+            for angle in (0, 90, 180, 270)
+        }
 
-        # Get the Rect of the Surface
-        self.rect = self.surf.get_rect(center=(start_x, start_y))
+    return _surfs_cache[key]
 
-    def get_observation(self) -> np.ndarray:
-        """A function that returns the movable's information."""
 
-        # direction = [0]*4
-        # direction[self.angle//90] = 1
-        return np.array(
-            (
-                self.rect.center[0] / self.window_width,
-                self.rect.center[1] / self.window_height,
-                # *direction,
-                self.angle / 360,
-                self.speed / _Movable.max_speed,
-            ),
-            dtype=np.float32,
+def _load_scaled(image_path: str, scale: float) -> pygame.Surface:
+    """A function that loads an image and resizes it to a rendering scale."""
+
+    surf = pygame.image.load(image_path)
+    if scale != 1:
+        surf = pygame.transform.scale(
+            surf,
+            (round(surf.get_width() * scale), round(surf.get_height() * scale)),
         )
 
+    return surf
 
-# We need to create class _Bullet before class _Tank
-# because the latter one uses the former one.
-class _Bullet(_Movable):
-    def __init__(
-            self,
-            window_width: int,
-            window_height: int,
-            tank_size: tuple[int, int],
-            tank_center: tuple[int, int],
-            angle: int,
-            speed: int,
-            image_path: str,
-            resize_ratio: float = 1.0) -> None:
-        # Initialize _Movable with (0, 0) as the starting location first
-        super().__init__(
-            window_width=window_width,
-            window_height=window_height,
-            start_x=0,
-            start_y=0,
-            start_angle=angle,
-            speed=speed,
-            image_path=image_path,
-            resize_ratio=resize_ratio
-        )
-        # Count the steps that the bullet survives
-        self.lifetime = 0
-
-        # Determine the starting location of the bullet based on 
-        # the location and the angle of the tank
-        if angle == 0:
-            start_x = tank_center[0] + 1  # The "+1" is for pixel adjustment
-            start_y = tank_center[1] - tank_size[1] // 2 \
-                      - self.surf.get_height() // 2
-        elif angle == 90:
-            start_x = tank_center[0] - tank_size[0] // 2 \
-                      - self.surf.get_width() // 2
-            start_y = tank_center[1]
-        elif angle == 180:
-            start_x = tank_center[0]
-            start_y = tank_center[1] + tank_size[1] // 2 \
-                      + self.surf.get_height() // 2
-        else:
-            start_x = tank_center[0] + tank_size[0] // 2 \
-                      + self.surf.get_width() // 2
-            start_y = tank_center[1]
-
-        # Utilize the calculated starting location
-        self.rect = self.surf.get_rect(center=(start_x, start_y))
-
-    def move(self) -> None:
-        """A function that moves the bullet."""
-        self.lifetime += 1
-        if self.angle == 0:
-            self.rect.move_ip(0, -self.speed)
-        elif self.angle == 90:
-            self.rect.move_ip(-self.speed, 0)
-        elif self.angle == 180:
-            self.rect.move_ip(0, self.speed)
-        else:
-            self.rect.move_ip(self.speed, 0)
 
+class SpritePool:
+    """
+    A fixed-capacity pool of sprites. A sprite is free to be recycled
+    once it has been killed, i.e. it does not belong to any group.
+    """
 
-class _PlayerBullet(_Bullet):
-    # Image source: https://craftpix.net/freebies/free-2d-battle-tank-game-assets/
-    # License: https://craftpix.net/file-licenses/
-    image_path = os.path.join(images_path, "bullets/bullet_01.png")
+    def __init__(self, sprites: list[pygame.sprite.Sprite]) -> None:
+        self.sprites = sprites
 
-    resize_ratio = 2
+    def acquire(self) -> pygame.sprite.Sprite | None:
+        """A function that returns a free sprite, or None if all are in use."""
 
-    def __init__(
-            self,
-            window_width: int,
-            window_height: int,
-            tank_size: tuple[int, int],
-            tank_center: tuple[int, int],
-            angle: int,
-            speed: int) -> None:
-        super().__init__(
-            window_width=window_width,
-            window_height=window_height,
-            tank_size=tank_size,
-            tank_center=tank_center,
-            angle=angle,
-            speed=speed,
-            image_path=self.image_path,
-            resize_ratio=self.resize_ratio,
-        )
+        for sprite in self.sprites:
+            if not sprite.alive():
+                return sprite
 
+        return None
 
-class _EnemyBullet(_Bullet):
-    # Image source: https://craftpix.net/freebies/free-2d-battle-tank-game-assets/
-    # License: https://craftpix.net/file-licenses/
-    image_path = os.path.join(images_path, "bullets/bullet_02.png")
 
-    resize_ratio = 1.5
+class _Movable:
+    """
+    The image of a kind of movables. The states of the movables are kept
+    in the stores of gym_tankwar.envs.entities.
+    """
 
-    def __init__(
-            self,
-            window_width: int,
-            window_height: int,
-            tank_size: tuple[int, int],
-            tank_center: tuple[int, int],
-            angle: int,
-            speed: int) -> None:
-        super().__init__(
-            window_width=window_width,
-            window_height=window_height,
-            tank_size=tank_size,
-            tank_center=tank_center,
-            angle=angle,
-            speed=speed,
-            image_path=self.image_path,
-            resize_ratio=self.resize_ratio,
-        )
+    # Max. speed is the player's bullet's speed in 15-FPS mode
+    max_speed = 14
 
+    image_path = None
 
-class _Tank(_Movable):
-    def __init__(
-            self,
-            window_width: int,
-            window_height: int,
-            bullet: _Bullet,
-            start_x: int,
-            start_y: int,
-            start_angle: int,
-            speed: int,
-            last_shoot: int,
-            image_path: str,
-            resize_ratio: float = 1.0) -> None:
-        super().__init__(
-            window_width=window_width,
-            window_height=window_height,
-            start_x=start_x,
-            start_y=start_y,
-            start_angle=start_angle,
-            speed=speed,
-            image_path=image_path,
-            resize_ratio=resize_ratio,
-        )
+    resize_ratio = 1.0
 
-        # Keep the tank inside the window
-        self._keep_inside()
-
-        # Store the type of bullet used by the tank, 
-        # either _PlayerBullet or _EnemyBullet
-        self.bullet = bullet
-
-        # Store the last step when the tank so the next step when the tank 
-        # can shoot can be calculated
-        self.last_shoot = last_shoot
-
-    def _keep_inside(self) -> tuple[bool, list[int]]:
-        """An internal function that keeps the tank inside the window."""
-
-        touches_border = False
-        correction_angles = []
-        if self.rect.left < 0:  # Touch left border
-            self.rect.left = 0
-            touches_border = True
-            correction_angles.extend([0, 180, 270])
-        elif self.rect.right > self.window_width:  # Touch right border
-            self.rect.right = self.window_width
-            touches_border = True
-            correction_angles.extend([0, 90, 180])
-        if self.rect.top < 0:  # Touch top border
-            self.rect.top = 0
-            touches_border = True
-            correction_angles.extend([90, 180, 270])
-        elif self.rect.bottom > self.window_height:  # Touch bottom border
-            self.rect.bottom = self.window_height
-            touches_border = True
-            correction_angles.extend([0, 90, 270])
-
-        return touches_border, list(set(correction_angles))
-
-    def update(self, dx: int, dy: int,
-               new_angle: int) -> tuple[bool, list[int]]:
+    @classmethod
+    def surfs(cls, scale: float = 1.0) -> dict[int, pygame.Surface]:
         """
-        A function that rotates the tank (if necessary) and 
-        moves the tank
+        A function that returns the Surfaces of the image for all angles
+        at a rendering scale.
         """
 
-        # Rotate the Surface if necessary
-        if new_angle != self.angle:
-            self.surf = pygame.transform.rotate(
-                self.surf, self._angle_to_rotation(new_angle)
-            )
-            self.rect = self.surf.get_rect(center=self.rect.center)
-            self.angle = new_angle
+        return _load_surfs(cls.image_path, cls.resize_ratio, scale)
 
-        # Move the Rect
-        self.rect.move_ip(dx * self.speed, dy * self.speed)
+    @classmethod
+    def sizes(cls) -> dict[int, tuple[int, int]]:
+        """A function that returns the sizes of the image for all angles."""
 
-        touches_border, correction_angles = self._keep_inside()
+        return {angle: surf.get_size() for angle, surf in cls.surfs().items()}
 
-        return touches_border, correction_angles
 
-    def _angle_to_rotation(self, target_angle: int) -> int:
-        """
-        An internal function that maps the target angle to 
-        a suitable rotation.
-        """
+class _Bullet(_Movable):
+    pass
+
+
+class _PlayerBullet(_Bullet):
+    # Image source: https://craftpix.net/freebies/free-2d-battle-tank-game-assets/
+    # License: https://craftpix.net/file-licenses/
+    image_path = os.path.join(images_path, "bullets/bullet_01.png")
+
+    resize_ratio = 2
+
 
-        rotation = target_angle - self.angle
-        if rotation < 0:
-            rotation = 360 + rotation
+class _EnemyBullet(_Bullet):
+    # Image source: https://craftpix.net/freebies/free-2d-battle-tank-game-assets/
+    # License: https://craftpix.net/file-licenses/
+    image_path = os.path.join(images_path, "bullets/bullet_02.png")
+
+    resize_ratio = 1.5
 
-        return rotation
+
+class _Tank(_Movable):
+    # The type of bullet used by the tank, either _PlayerBullet or _EnemyBullet
+    bullet = None
 
 
 class Player(_Tank):
@@ -288,26 +161,7 @@ class Player(_Tank):
 
     resize_ratio = 5.5
 
-    def __init__(
-            self,
-            window_width: int,
-            window_height: int,
-            start_x: int,
-            start_y: int,
-            start_angle: int,
-            speed: int) -> None:
-        super().__init__(
-            window_width=window_width,
-            window_height=window_height,
-            bullet=_PlayerBullet,
-            start_x=start_x,
-            start_y=start_y,
-            start_angle=start_angle,
-            speed=speed,
-            last_shoot=0,
-            image_path=self.image_path,
-            resize_ratio=self.resize_ratio,
-        )
+    bullet = _PlayerBullet
 
 
 class Enemy(_Tank):
@@ -317,29 +171,7 @@ class Enemy(_Tank):
 
     resize_ratio = 4.4
 
-    def __init__(
-            self,
-            window_width: int,
-            window_height: int,
-            start_x: int,
-            start_y: int,
-            start_angle: int,
-            speed: int,
-            creation_step: int) -> None:
-        super().__init__(
-            window_width=window_width,
-            window_height=window_height,
-            bullet=_EnemyBullet,
-            start_x=start_x,
-            start_y=start_y,
-            start_angle=start_angle,
-            speed=speed,
-            last_shoot=creation_step,
-            image_path=self.image_path,
-            resize_ratio=self.resize_ratio,
-        )
-
-        self.last_rotate = creation_step
+    bullet = _EnemyBullet
 
 
 class Heart(pygame.sprite.Sprite):
@@ -349,7 +181,7 @@ class Heart(pygame.sprite.Sprite):
 
     resize_ratio = 5
 
-    def __init__(self, window_width: int, order: int) -> None:
+    def __init__(self, window_width: int, order: int, scale: float = 1.0) -> None:
         super().__init__()
 
         self.surf = pygame.image.load(self.image_path)
@@ -357,14 +189,15 @@ class Heart(pygame.sprite.Sprite):
         self.surf = pygame.transform.scale(
             self.surf,
             (
-                self.surf.get_width() / self.resize_ratio,
-                self.surf.get_height() / self.resize_ratio,
+                self.surf.get_width() / self.resize_ratio * scale,
+                self.surf.get_height() / self.resize_ratio * scale,
             ),
         )
+        self.surf = _convert(self.surf)
         self.rect = self.surf.get_rect(
             center=(
-                window_width - order * self.surf.get_width() + 7,
-                self.surf.get_height() // 2 + 5,
+                window_width - order * self.surf.get_width() + round(7 * scale),
+                self.surf.get_height() // 2 + round(5 * scale),
             )
         )
 
@@ -373,32 +206,61 @@ class Explosion(pygame.sprite.Sprite):
     # Image source: http://gushh.net/blog/free-game-sprites-explosion-4/
     # License: http://gushh.net/blog/free-game-sprites-explosion-1/
 
+    # The sizes of the explosions of a tank and a bullet
+    tank_size = (80, 80)
+    bullet_size = (20, 20)
+
+    # Loaded animation images shared by all explosions
+    _images_cache = {}
+
     # Code source: https://github.com/russs123/Explosion/blob/main/explosion.py
-    def __init__(self, obj, terminated=False):
+    def __init__(self, center: tuple[int, int], size: tuple[int, int] | None,
+                 terminated=False):
         pygame.sprite.Sprite.__init__(self)
 
-        self.images = []
-        if not os.path.exists(os.path.join(images_path, "explosion/explosion_0.png")):
-            self.crop_img()
-
-        for num in range(1, len([name for name in os.listdir(os.path.join(images_path, "explosion/"))]) - 1, 4):
-            if terminated:
-                num = 25
-            # Choose a sampled subset of all images to increase animation speed
-            image_path = os.path.join(images_path, f"explosion/explosion_{num}.png")
-            img = pygame.image.load(image_path)
-            if isinstance(obj, _Tank):
-                img = pygame.transform.scale(img, (80, 80))
-            elif isinstance(obj, _Bullet):
-                img = pygame.transform.scale(img, (20, 20))
-            self.images.append(img)
+        self.reinit(center, size, terminated)
+
+    def reinit(self, center: tuple[int, int], size: tuple[int, int] | None,
+               terminated=False):
+        """A function that reinitializes the explosion in place at a given location."""
+
+        self.size = size
+        self.terminated = terminated
 
+        self.images = self._load_images(size, terminated)
         self.index = 0
         self.surf = self.images[self.index]
         self.rect = self.surf.get_rect()
-        self.rect.center = obj.rect.center
+        self.rect.center = center
         self.counter = 0
 
+        # The order in which the explosion is drawn
+        self.seq = 0
+
+    @classmethod
+    def _load_images(cls, size, terminated):
+        """An internal function that loads and resizes the animation images once."""
+
+        key = (size, terminated, pygame.display.get_init())
+        if key not in cls._images_cache:
+            images = []
+            if not os.path.exists(os.path.join(images_path, "explosion/explosion_0.png")):
+                cls.crop_img()
+
+            for num in range(1, len([name for name in os.listdir(os.path.join(images_path, "explosion/"))]) - 1, 4):
+                if terminated:
+                    num = 25
+                # Choose a sampled subset of all images to increase animation speed
+                image_path = os.path.join(images_path, f"explosion/explosion_{num}.png")
+                img = pygame.image.load(image_path)
+                if size is not None:
+                    img = pygame.transform.scale(img, size)
+                images.append(_convert(img))
+
+            cls._images_cache[key] = images
+
+        return cls._images_cache[key]
+
     def update(self, explosion_speed=4):
         # Update explosion animation
         self.counter += 1
@@ -446,10 +308,10 @@ class Background(pygame.sprite.Sprite):
     # License: https://creativecommons.org/licenses/by/3.0/
     image_path = os.path.join(images_path, "background.png")
 
-    def __init__(self) -> None:
+    def __init__(self, scale: float = 1.0) -> None:
         super().__init__()
 
-        self.surf = pygame.image.load(self.image_path)
+        self.surf = _load_scaled(self.image_path, scale)
         self.surf.set_alpha(200)
 
 
@@ -474,11 +336,95 @@ class Audios:
     explosion_sound = os.path.join(audios_path, "explosion.wav")
 
 
+class SharedPygame:
+    """
+    A class that initializes pygame, its sound module and the window once 
+    for all envs in the process and quits them when the last env using 
+    them is closed. Fonts are shared by all envs as well.
+    """
+
+    # The numbers of envs that use pygame, the sound module and the window
+    users = 0
+    sound_users = 0
+    window_users = 0
+
+    # Fonts shared by all envs, which are only valid while pygame is initialized
+    _fonts = {}
+
+    @classmethod
+    def acquire(cls, sound: bool) -> None:
+        """
+        A function that initializes pygame and the sound module (if 
+        necessary) for a new user.
+        """
+
+        if cls.users == 0:
+            pygame.init()
+        cls.users += 1
+
+        if sound:
+            if cls.sound_users == 0:
+                pygame.mixer.init()
+
+                # Load and play the background music
+                pygame.mixer.music.load(Audios.background_music)
+                pygame.mixer.music.play(loops=-1)
+            cls.sound_users += 1
+
+    @classmethod
+    def open_window(cls, size: tuple[int, int]) -> pygame.Surface:
+        """A function that opens the window or returns the opened one."""
+
+        if cls.window_users == 0:
+            pygame.display.set_caption("Tank War")
+            pygame.display.set_mode(size)
+        cls.window_users += 1
+
+        return pygame.display.get_surface()
+
+    @classmethod
+    def release(cls, sound: bool, window: bool) -> None:
+        """
+        A function that closes the window, the sound module and pygame 
+        when their last user releases them.
+        """
+
+        if window:
+            cls.window_users -= 1
+            if cls.window_users == 0 and cls.users > 1:
+                # Close the window while keeping the display module 
+                # initialized for the remaining users
+                pygame.display.quit()
+                pygame.display.init()
+
+        if sound:
+            cls.sound_users -= 1
+            if cls.sound_users == 0:
+                # Stop and quit the sound module
+                pygame.mixer.music.stop()
+                pygame.mixer.quit()
+
+        cls.users -= 1
+        if cls.users == 0:
+            # Quit pygame, which invalidates all fonts
+            pygame.quit()
+            cls._fonts.clear()
+
+    @classmethod
+    def font(cls, size: int) -> pygame.font.Font:
+        """A function that loads a font of a size once."""
+
+        if size not in cls._fonts:
+            cls._fonts[size] = pygame.font.SysFont("Garamond", size)
+
+        return cls._fonts[size]
+
+
 class Black:
     image_path = os.path.join(images_path, "black.png")
 
-    def __init__(self) -> None:
+    def __init__(self, scale: float = 1.0) -> None:
         super().__init__()
 
-        self.surf = pygame.image.load(self.image_path)
+        self.surf = _convert(_load_scaled(self.image_path, scale))
         self.surf.set_alpha(160)
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pygame
+
+from .assets import _Bullet, _Movable, _Tank
+
+
+class _MovableStore:
+    """
+    A fixed-capacity store of movables of one kind. The Rects, angles, speeds
+    and timers of all movables are kept in NumPy arrays indexed by slot.
+    The Rects follow the integer arithmetic of pygame.Rect.
+    """
+
+    def __init__(self, kind: type[_Movable], capacity: int,
+                 window_width: int, window_height: int) -> None:
+        # The asset class that defines the image of the movables
+        self.kind = kind
+
+        self.capacity = capacity
+        self.window_width = window_width
+        self.window_height = window_height
+
+        # The sizes of the Rect for all angles
+        self.sizes = kind.sizes()
+
+        # The Rects of the movables
+        self.x = np.zeros(capacity, dtype=np.int64)
+        self.y = np.zeros(capacity, dtype=np.int64)
+        self.w = np.zeros(capacity, dtype=np.int64)
+        self.h = np.zeros(capacity, dtype=np.int64)
+
+        self.angle = np.zeros(capacity, dtype=np.int64)
+        self.speed = np.zeros(capacity, dtype=np.int64)
+
+        # The order in which the movables are drawn
+        self.seq = np.zeros(capacity, dtype=np.int64)
+
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        # The slots of alive movables in the order of creation
+        self.slots = []
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def __iter__(self):
+        # Iterate over a copy so that movables can be killed in the loop
+        return iter(self.slots.copy())
+
+    def _spawn(self, center: tuple[int, int], angle: int,
+               speed: int, seq: int) -> int:
+        """
+        An internal function that places a new movable in a free slot
+        and returns the slot.
+        """
+
+        slot = int(np.argmin(self.alive))
+        self.alive[slot] = True
+        self.slots.append(slot)
+
+        self.w[slot], self.h[slot] = self.sizes[angle]
+        self.angle[slot] = angle
+        self.speed[slot] = speed
+        self.seq[slot] = seq
+        self.set_center(slot, center)
+
+        return slot
+
+    def kill(self, slot: int) -> None:
+        """
+        A function that removes a movable. Its state is kept until the
+        slot is reused.
+        """
+
+        if self.alive[slot]:
+            self.alive[slot] = False
+            self.slots.remove(slot)
+
+    def clear(self) -> None:
+        """A function that removes all movables."""
+
+        self.alive[:] = False
+        self.slots.clear()
+
+    def get_state(self) -> dict:
+        """A function that returns a copy of the arrays and slots of the store."""
+
+        return {name: value.copy() for name, value in vars(self).items()
+                if isinstance(value, (np.ndarray, list))}
+
+    def set_state(self, state: dict) -> None:
+        """A function that restores the arrays and slots of the store in place."""
+
+        for name, value in state.items():
+            target = getattr(self, name)
+            target[:] = np.asarray(value).tolist() if isinstance(target, list) else value
+
+    def center(self, slot: int) -> tuple[int, int]:
+        """A function that returns the center of a movable's Rect."""
+
+        return (int(self.x[slot]) + int(self.w[slot]) // 2,
+                int(self.y[slot]) + int(self.h[slot]) // 2)
+
+    def centers(self) -> list[tuple[int, int]]:
+        """A function that returns the centers of all alive movables."""
+
+        slots = self.slots
+        return list(zip((self.x[slots] + self.w[slots] // 2).tolist(),
+                        (self.y[slots] + self.h[slots] // 2).tolist()))
+
+    def set_center(self, slot: int, center: tuple[int, int]) -> None:
+        """A function that moves the center of a movable's Rect."""
+
+        self.x[slot] = center[0] - self.w[slot] // 2
+        self.y[slot] = center[1] - self.h[slot] // 2
+
+    def size(self, slot: int) -> tuple[int, int]:
+        """A function that returns the size of a movable's Rect."""
+
+        return int(self.w[slot]), int(self.h[slot])
+
+    def rect(self, slot: int) -> tuple[int, int, int, int]:
+        """A function that returns the Rect of a movable as a tuple."""
+
+        return (int(self.x[slot]), int(self.y[slot]),
+                int(self.w[slot]), int(self.h[slot]))
+
+    def collide(self, rect: tuple[int, int, int, int],
+                dokill: bool = False) -> list[int]:
+        """
+        A function that returns the slots of all alive movables that
+        collide with a Rect, in the order of creation, and removes them
+        if dokill is true.
+        """
+
+        x, y, w, h = rect
+        collided = ((self.x < x + w) & (self.x + self.w > x) &
+                    (self.y < y + h) & (self.y + self.h > y))
+
+        slots = [slot for slot in self.slots if collided[slot]]
+        if dokill:
+            for slot in slots:
+                self.kill(slot)
+
+        return slots
+
+    def observe(self, out: np.ndarray, slots: list[int] | None = None) -> None:
+        """
+        A function that writes the movables' information into an array
+        with one row per movable.
+        """
+
+        if slots is None:
+            slots = self.slots
+
+        out[:, 0] = (self.x[slots] + self.w[slots] // 2) / self.window_width
+        out[:, 1] = (self.y[slots] + self.h[slots] // 2) / self.window_height
+        out[:, 2] = self.angle[slots] / 360
+        out[:, 3] = self.speed[slots] / _Movable.max_speed
+
+    def observe_slots(self, out: np.ndarray) -> None:
+        """
+        A function that writes each alive movable's information into the 
+        row of an array indexed by its slot.
+        """
+
+        slots = self.slots
+        out[slots, 0] = (self.x[slots] + self.w[slots] // 2) / self.window_width
+        out[slots, 1] = (self.y[slots] + self.h[slots] // 2) / self.window_height
+        out[slots, 2] = self.angle[slots] / 360
+        out[slots, 3] = self.speed[slots] / _Movable.max_speed
+
+    def rasterize(self, out: np.ndarray, cell: int,
+                  slots: list[int] | None = None) -> None:
+        """
+        A function that marks the cells of a grid covered by the movables' 
+        Rects, where each cell is a square of cell pixels.
+        """
+
+        if slots is None:
+            slots = self.slots
+
+        rows, cols = out.shape
+        x0 = np.clip(self.x[slots] // cell, 0, cols).tolist()
+        x1 = np.clip(-(-(self.x[slots] + self.w[slots]) // cell), 0, cols).tolist()
+        y0 = np.clip(self.y[slots] // cell, 0, rows).tolist()
+        y1 = np.clip(-(-(self.y[slots] + self.h[slots]) // cell), 0, rows).tolist()
+
+        for top, bottom, left, right in zip(y0, y1, x0, x1):
+            out[top:bottom, left:right] = 1
+
+    def sprites(self, scale: float = 1.0
+                ) -> list[tuple[int, pygame.Surface, tuple[int, int]]]:
+        """
+        A function that returns the drawing order, the Surface and the
+        location of all alive movables at a rendering scale.
+        """
+
+        surfs = self.kind.surfs(scale)
+        return [
+            (int(self.seq[slot]), surfs[int(self.angle[slot])],
+             (round(int(self.x[slot]) * scale),
+              round(int(self.y[slot]) * scale)))
+            for slot in self.slots
+        ]
+
+
+class BulletStore(_MovableStore):
+    def __init__(self, kind: type[_Bullet], capacity: int,
+                 window_width: int, window_height: int) -> None:
+        super().__init__(kind, capacity, window_width, window_height)
+
+        # Count the steps that the bullets survive
+        self.lifetime = np.zeros(capacity, dtype=np.int64)
+
+    def spawn(self, tank_size: tuple[int, int], tank_center: tuple[int, int],
+              angle: int, speed: int, seq: int) -> int:
+        """
+        A function that creates a new bullet in front of a tank and
+        returns its slot.
+        """
+
+        width, height = self.sizes[angle]
+
+        # Determine the starting location of the bullet based on
+        # the location and the angle of the tank
+        if angle == 0:
+            start_x = tank_center[0] + 1  # The "+1" is for pixel adjustment
+            start_y = tank_center[1] - tank_size[1] // 2 - height // 2
+        elif angle == 90:
+            start_x = tank_center[0] - tank_size[0] // 2 - width // 2
+            start_y = tank_center[1]
+        elif angle == 180:
+            start_x = tank_center[0]
+            start_y = tank_center[1] + tank_size[1] // 2 + height // 2
+        else:
+            start_x = tank_center[0] + tank_size[0] // 2 + width // 2
+            start_y = tank_center[1]
+
+        slot = self._spawn((start_x, start_y), angle, speed, seq)
+        self.lifetime[slot] = 0
+
+        return slot
+
+    def move(self) -> list[int]:
+        """
+        A function that moves all bullets and returns the slots of the
+        bullets that are outside the window.
+        """
+
+        slots = self.slots
+        angle = self.angle[slots]
+        speed = self.speed[slots]
+
+        self.lifetime[slots] += 1
+        self.x[slots] += np.where(angle == 90, -speed, 0) + np.where(angle == 270, speed, 0)
+        self.y[slots] += np.where(angle == 0, -speed, 0) + np.where(angle == 180, speed, 0)
+
+        x, y = self.x[slots], self.y[slots]
+        outside = ((x + self.w[slots] < 0) | (x > self.window_width) |
+                   (y + self.h[slots] <= 0) | (y >= self.window_height))
+
+        return [slot for slot, out in zip(slots, outside) if out]
+
+
+class TankStore(_MovableStore):
+    def __init__(self, kind: type[_Tank], capacity: int,
+                 window_width: int, window_height: int) -> None:
+        super().__init__(kind, capacity, window_width, window_height)
+
+        # Store the last step when the tanks shoot and rotate so the next
+        # steps when the tanks can shoot and rotate can be calculated
+        self.last_shoot = np.zeros(capacity, dtype=np.int64)
+        self.last_rotate = np.zeros(capacity, dtype=np.int64)
+
+    def spawn(self, center: tuple[int, int], angle: int, speed: int,
+              creation_step: int, seq: int) -> int:
+        """
+        A function that creates a new tank inside the window and
+        returns its slot.
+        """
+
+        slot = self._spawn(center, angle, speed, seq)
+        self.last_shoot[slot] = creation_step
+        self.last_rotate[slot] = creation_step
+
+        # Keep the tank inside the window
+        self._keep_inside(slot)
+
+        return slot
+
+    def _keep_inside(self, slot: int) -> tuple[bool, list[int]]:
+        """An internal function that keeps a tank inside the window."""
+
+        touches_border = False
+        correction_angles = []
+        if self.x[slot] < 0:  # Touch left border
+            self.x[slot] = 0
+            touches_border = True
+            correction_angles.extend([0, 180, 270])
+        elif self.x[slot] + self.w[slot] > self.window_width:  # Touch right border
+            self.x[slot] = self.window_width - self.w[slot]
+            touches_border = True
+            correction_angles.extend([0, 90, 180])
+        if self.y[slot] < 0:  # Touch top border
+            self.y[slot] = 0
+            touches_border = True
+            correction_angles.extend([90, 180, 270])
+        elif self.y[slot] + self.h[slot] > self.window_height:  # Touch bottom border
+            self.y[slot] = self.window_height - self.h[slot]
+            touches_border = True
+            correction_angles.extend([0, 90, 270])
+
+        return touches_border, list(set(correction_angles))
+
+    def update(self, slot: int, dx: int, dy: int,
+               new_angle: int) -> tuple[bool, list[int]]:
+        """
+        A function that rotates a tank (if necessary) and
+        moves the tank
+        """
+
+        # Rotate the Rect around its center if necessary
+        if new_angle != self.angle[slot]:
+            center = self.center(slot)
+            self.w[slot], self.h[slot] = self.sizes[new_angle]
+            self.set_center(slot, center)
+            self.angle[slot] = new_angle
+
+        # Move the Rect
+        self.x[slot] += dx * self.speed[slot]
+        self.y[slot] += dy * self.speed[slot]
+
+        return self._keep_inside(slot)
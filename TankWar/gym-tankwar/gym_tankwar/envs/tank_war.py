@@ -5,15 +5,33 @@ import numpy as np
 import pygame
 from gym import spaces
 
-from .assets import Audios, Background, Black, Enemy, Explosion, Heart, Player
+from .assets import (Audios, Background, Black, Enemy, Explosion, Heart, Player,
+                     SharedPygame, SpritePool)
+from .entities import BulletStore, TankStore
+
+# The indices of the terms of the reward in TankWar.reward_terms
+(_SURVIVAL, _BORDER, _ENEMY_PROXIMITY, _BULLET_NEAR_ENEMY, _SHOOT_DIRECTION,
+ _MISS, _ENEMY_BULLET_PROXIMITY, _KILL, _DEATH) = range(9)
 
 
 class TankWar(gym.Env):
     metadata = {"render_modes": ("human", "rgb_array"), "render_fps": 30}
 
+    # "vector": a flat vector of all tanks' and bullets' information
+    # "grid": an occupancy grid with one channel per kind of tanks and bullets
+    # "entities": a table and a presence mask per kind of tanks and bullets
+    observation_modes = ("vector", "grid", "entities")
+
+    # The names of the terms of the reward in the order of the reward breakdown
+    reward_terms = ("survival", "border", "enemy_proximity", "bullet_near_enemy",
+                    "shoot_direction", "miss", "enemy_bullet_proximity", "kill", "death")
+
     def __init__(self, render_mode: str | None,
                  starting_hp: int, difficulty: int,
-                 full_enemy: bool, episodes: int, extra_scene: bool = False) -> None:
+                 full_enemy: bool, episodes: int, extra_scene: bool = False,
+                 observation_mode: str = "vector", render_scale: float = 1.0,
+                 sim_hz: int = 30, reward_weights: dict[str, float] | None = None,
+                 render_fps: int | None = None) -> None:
         # The starting health point (HP) of the player
         self.starting_hp = starting_hp
 
@@ -29,9 +47,36 @@ class TankWar(gym.Env):
         # Whether or not show beginning and ending scenes
         self.extra_scene = extra_scene
 
+        assert sim_hz > 0
+
+        # The number of simulation steps per game second. All speeds, 
+        # intervals and probabilities are converted from a tick rate of 30.
+        self.sim_hz = sim_hz
+
+        assert render_fps is None or render_fps > 0
+
+        # The framerate of the window in human mode, which is the tick rate
+        # if not specified. Physics only depends on the tick rate, and the
+        # framerate of this env does not affect other envs.
+        self.render_fps = render_fps if render_fps is not None else sim_hz
+        self.metadata = {**self.metadata, "render_fps": self.render_fps}
+
+        # The number of frames that the current step is still owed in human
+        # mode, so that each step is shown for 1 / sim_hz seconds on average
+        self.frame_credit = 0.0
+
         # The size of the pygame window
         self.window_width, self.window_height = 450, 350
 
+        assert render_scale > 0
+
+        # The ratio of the size of the rendered frames to the size of the 
+        # window. The sprites, background and HUD are resized once to this 
+        # scale, so small frames are drawn directly without downscaling.
+        self.render_scale = render_scale
+        self.canvas_width = self._scaled(self.window_width)
+        self.canvas_height = self._scaled(self.window_height)
+
         # All possible angles of the tanks and bullets
         self.angles = (0, 90, 180, 270)
 
@@ -68,6 +113,19 @@ class TankWar(gym.Env):
         # The reward when the player is constrained by the border
         self.player_on_border_reward = -0.1
 
+        if reward_weights is None:
+            reward_weights = {}
+
+        assert set(reward_weights) <= set(self.reward_terms)
+
+        # The weight of each term of the reward. A term with a weight of 0 
+        # is disabled and not computed at all.
+        self.reward_weights = [float(reward_weights.get(term, 1)) for term in self.reward_terms]
+
+        # The weighted terms of the reward of the last step, which is 
+        # overwritten in place at every step
+        self.reward_breakdown = np.zeros(len(self.reward_terms), dtype=np.float64)
+
         # The minimum difference between player and border coordinate
         self.border = 23
 
@@ -80,14 +138,52 @@ class TankWar(gym.Env):
         # A variable that counts how many episode has been run
         self.episode = 0
 
-        # Normalized observation: all tanks' and bullets' location, angle, speed, 
-        # and the player's cannon's remaining reloading time
-        self.observation_space = spaces.Box(
-            low=min(self.empty_space, 0),
-            high=1,
-            shape=((1 + self.max_player_bullets + self.max_enemies + self.max_enemy_bullets) * self.obs_size + 1,),
-            dtype=np.float32,
-        )
+        # The size (in pixel) of a cell of the occupancy grid
+        self.grid_cell = 10
+
+        assert observation_mode in self.observation_modes
+
+        self.observation_mode = observation_mode
+
+        if self.observation_mode == "vector":
+            # Normalized observation: all tanks' and bullets' location, angle, speed, 
+            # and the player's cannon's remaining reloading time
+            self.observation_space = spaces.Box(
+                low=min(self.empty_space, 0),
+                high=1,
+                shape=((1 + self.max_player_bullets + self.max_enemies + self.max_enemy_bullets) * self.obs_size + 1,),
+                dtype=np.float32,
+            )
+        elif self.observation_mode == "entities":
+            # Entity tables: one row per slot of each kind of tanks and bullets with 
+            # the same information as the vector observation, a mask of the slots 
+            # in use, and the player's cannon's remaining reloading time
+            tables = {}
+            for name, max_n in self._entity_tables():
+                tables[name] = spaces.Box(low=0, high=1, shape=(max_n, self.obs_size), dtype=np.float32)
+                tables[f"{name}_mask"] = spaces.Box(low=0, high=1, shape=(max_n,), dtype=bool)
+            tables["reload"] = spaces.Box(low=0, high=1, shape=(1,), dtype=np.float32)
+            self.observation_space = spaces.Dict(tables)
+
+            # The arrays that every entity observation is filled into in place 
+            # before it is copied
+            self.entity_observation = {
+                name: np.zeros(space.shape, dtype=space.dtype)
+                for name, space in self.observation_space.items()
+            }
+        else:
+            # Occupancy grid: the cells covered by the player, the player's bullets,
+            # the enemies and the enemies' bullets in four channels
+            self.observation_space = spaces.Box(
+                low=0,
+                high=1,
+                shape=(
+                    -(-self.window_height // self.grid_cell),
+                    -(-self.window_width // self.grid_cell),
+                    4,
+                ),
+                dtype=np.uint8,
+            )
 
         # print(self.observation_space.sample())  # For testing purposes
 
@@ -100,106 +196,126 @@ class TankWar(gym.Env):
                 render_mode in self.metadata["render_modes"]
         )
 
+        # In human mode, every reset and step draws a frame to the window. In
+        # rgb_array mode, frames are only drawn when render() is called, so
+        # steps that are never rendered skip drawing. Drawing has no effect
+        # on the game state.
         self.render_mode = render_mode
 
         self.pygame_initialized = False
 
+        # Whether or not the game is simulated without sprites and sounds, 
+        # which is only true during rollouts
+        self.headless = False
+
+        # The stores of tanks and bullets and the sprites will be created once 
+        # at the first reset and reused afterwards
+        self.player = None
+
         self.font = None
-        self.background = None
+        self.base = None
         self.black = None
 
         # The following will remain None iff "rgb_array" mode is used
         self.window = None
         self.clock = None
 
-    def _get_observation(self) -> np.ndarray:
-        # Get the player's observation
-        player_observation = self.player.get_observation()
+    def _entity_tables(self) -> tuple[tuple[str, int], ...]:
+        """
+        An internal function that returns the name and the number of rows 
+        of each entity table.
+        """
 
-        # Get all player's bullets' observation
-        if len(self.player_bullets) > 0:
-            player_bullets_observation = np.concatenate(
-                [bullet.get_observation() for bullet in self.player_bullets]
-            )
-            player_bullets_observation = np.pad(
-                player_bullets_observation,
-                (0, self.max_player_bullets * self.obs_size \
-                 - len(player_bullets_observation)),
-                "constant",
-                constant_values=(self.empty_space,),
-            )
-        else:
-            player_bullets_observation = np.full(
-                (self.max_player_bullets * self.obs_size,),
-                self.empty_space,
-                dtype=np.float32,
-            )
+        return (("player", 1),
+                ("player_bullets", self.max_player_bullets),
+                ("enemies", self.max_enemies),
+                ("enemy_bullets", self.max_enemy_bullets))
 
-        # Get all enemies' observation
-        if len(self.enemies) > 0:
-            enemies_observation = np.concatenate(
-                [enemy.get_observation() for enemy in self.enemies]
-            )
-            enemies_observation = np.pad(
-                enemies_observation,
-                (0, self.max_enemies * self.obs_size - len(enemies_observation)),
-                "constant",
-                constant_values=(self.empty_space,),
-            )
-        else:
-            enemies_observation = np.full(
-                (self.max_enemies * self.obs_size,),
-                self.empty_space,
-                dtype=np.float32,
-            )
+    def _get_reload_time(self) -> float:
+        """
+        An internal function that returns the player's cannon's remaining 
+        reloading time as a fraction of the shooting interval.
+        """
 
-        # Get all enemies' bullets' observation
-        if len(self.enemy_bullets) > 0:
-            enemy_bullets_observation = np.concatenate(
-                [bullet.get_observation() for bullet in self.enemy_bullets]
-            )
-            enemy_bullets_observation = np.pad(
-                enemy_bullets_observation,
-                (0, self.max_enemy_bullets * self.obs_size \
-                 - len(enemy_bullets_observation)),
-                "constant",
-                constant_values=(self.empty_space,),
-            )
-        else:
-            enemy_bullets_observation = np.full(
-                (self.max_enemy_bullets * self.obs_size,),
-                self.empty_space,
-                dtype=np.float32,
-            )
+        player_last_shoot = int(self.player.last_shoot[0])
 
-        # Get the player's cannon's remaining reloading time
-        player_cannon_reload_time = (
-            0 if self.player.last_shoot == 0
+        return (
+            0 if player_last_shoot == 0
             else max(
                 0,
-                1 - (self.steps - self.player.last_shoot)
-                / (self.metadata["render_fps"] * self.player_shoot_intvl),
+                1 - (self.steps - player_last_shoot)
+                / (self.sim_hz * self.player_shoot_intvl),
             )
         )
-        player_cannon_reload_time = np.array(
-            [player_cannon_reload_time],
-            dtype=np.float32,
-        )
 
-        # Concatenate all NumPy arrays
-        observation = np.concatenate(
-            [
-                player_observation, player_bullets_observation,
-                enemies_observation, enemy_bullets_observation,
-                player_cannon_reload_time,
-            ],
+    def _get_observation(self) -> np.ndarray | dict[str, np.ndarray]:
+        if self.observation_mode == "grid":
+            return self._get_grid_observation()
+        elif self.observation_mode == "entities":
+            return self._get_entity_observation()
+
+        # Fill empty observation space with a constant
+        observation = np.full(
+            self.observation_space.shape,
+            self.empty_space,
             dtype=np.float32,
         )
 
+        # Get the player's observation
+        self.player.observe(observation[:self.obs_size].reshape(1, self.obs_size), [0])
+
+        # Get all player's bullets', all enemies' and all enemies' bullets' observation
+        start = self.obs_size
+        for movables, max_n in ((self.player_bullets, self.max_player_bullets),
+                                (self.enemies, self.max_enemies),
+                                (self.enemy_bullets, self.max_enemy_bullets)):
+            movables.observe(
+                observation[start:start + len(movables) * self.obs_size]
+                .reshape(len(movables), self.obs_size)
+            )
+            start += max_n * self.obs_size
+
+        # Get the player's cannon's remaining reloading time
+        observation[-1] = self._get_reload_time()
+
         # print(observation)  # For testing purposes
 
         return observation
 
+    def _get_entity_observation(self) -> dict[str, np.ndarray]:
+        """
+        An internal function that fills the entity tables directly from 
+        the slots of the stores of tanks and bullets, and returns copies of 
+        them so that observations of different steps never share arrays.
+        """
+
+        observation = self.entity_observation
+        for (name, _), movables in zip(
+                self._entity_tables(),
+                (self.player, self.player_bullets, self.enemies, self.enemy_bullets)):
+            table = observation[name]
+            table.fill(0)
+            movables.observe_slots(table)
+            np.copyto(observation[f"{name}_mask"], movables.alive)
+        observation["reload"][0] = self._get_reload_time()
+
+        return {name: array.copy() for name, array in observation.items()}
+
+    def _get_grid_observation(self) -> np.ndarray:
+        """
+        An internal function that rasterizes all tanks and bullets into 
+        an occupancy grid without rendering.
+        """
+
+        observation = np.zeros(self.observation_space.shape, dtype=np.uint8)
+
+        self.player.rasterize(observation[:, :, 0], self.grid_cell, [0])
+        for channel, movables in enumerate(
+                (self.player_bullets, self.enemies, self.enemy_bullets), start=1):
+            movables.rasterize(observation[:, :, channel], self.grid_cell)
+
+        return observation
+
     def reset(self, seed: int | None = None,
               options=None) -> tuple[np.ndarray, dict]:
         # Seed self.np_random
@@ -212,21 +328,76 @@ class TankWar(gym.Env):
         self.score = 0
         self.hp = self.starting_hp
 
-        # Create a sprite group for all sprites except hearts
-        self.all_sprites = pygame.sprite.Group()
+        # The number of created tanks, bullets and explosions, which 
+        # determines the order of drawing them
+        self.sprite_seq = 0
+
+        # Initialize pygame before the sprites are created so that their 
+        # Surfaces can be converted to the pixel format of the canvas
+        self._init_pygame()
+
+        if self.player is None:
+            self._create_pools()
+        elif self.hearts is None:
+            self._restore_sprites()
+
+        # Remove all tanks, bullets, hearts and explosions so that they are
+        # free to be recycled
+        for movables in (self.player, self.enemies,
+                         self.player_bullets, self.enemy_bullets):
+            movables.clear()
+        self.hearts.empty()
+        self.explosions.empty()
 
         # Create the player
         self._create_player()
 
-        # Create a sprite group for enemies
-        self.enemies = pygame.sprite.Group()
-
         # Create sufficient enemies
         self._create_enemy()
 
-        # Create sprite groups for the player's and enemies' bullets
-        self.player_bullets = pygame.sprite.Group()
-        self.enemy_bullets = pygame.sprite.Group()
+        # Add all hearts to self.hearts
+        self.hearts.add(*self.heart_sprites)
+
+        # Get observation
+        observation = self._get_observation()
+
+        # Create a placeholder for additional information
+        info = {}
+
+        # Frames are only drawn in steps in human mode, and on demand by 
+        # render() in rgb_array mode
+        if self.render_mode == "human":
+            self._render_frame()
+
+        return observation, info
+
+    def _create_pools(self) -> None:
+        """
+        An internal function that creates fixed-capacity stores of tanks 
+        and bullets and pools of sprites, which are reused in place 
+        instead of being created again.
+        """
+
+        # Create the stores of the player, enemies and the player's and 
+        # enemies' bullets with their maximum numbers
+        self.player = TankStore(Player, 1, self.window_width, self.window_height)
+        self.enemies = TankStore(
+            Enemy, self.max_enemies, self.window_width, self.window_height
+        )
+        self.player_bullets = BulletStore(
+            Player.bullet, self.max_player_bullets, self.window_width, self.window_height
+        )
+        self.enemy_bullets = BulletStore(
+            Enemy.bullet, self.max_enemy_bullets, self.window_width, self.window_height
+        )
+
+        self._create_sprites()
+
+    def _create_sprites(self) -> None:
+        """
+        An internal function that creates the sprite groups and the pools 
+        of hearts and explosions.
+        """
 
         # Create a sprite group for hearts
         self.hearts = pygame.sprite.Group()
@@ -234,20 +405,88 @@ class TankWar(gym.Env):
         # Create a sprite group for explosion animations
         self.explosions = pygame.sprite.Group()
 
-        # Create hearts and add them to self.hearts and self.all_sprites
-        for i in range(1, self.starting_hp + 1):
-            heart = Heart(self.window_width, i)
-            self.hearts.add(heart)
+        # Create the pool of explosions with the number of explosions that 
+        # can be created in one step
+        self.explosion_pool = SpritePool([
+            Explosion((0, 0), None)
+            for _ in range(self.max_enemies + self.max_player_bullets + 1)
+        ])
 
-        # Get observation
-        observation = self._get_observation()
+        # Create all hearts
+        self.heart_sprites = [
+            Heart(self.canvas_width, i, self.render_scale)
+            for i in range(1, self.starting_hp + 1)
+        ]
 
-        # Create a placeholder for additional information
-        info = {}
+    def _restore_sprites(self) -> None:
+        """
+        An internal function that rebuilds the hearts and explosions of an 
+        unpickled env from their saved state.
+        """
 
-        self._render_frame()
+        self._init_pygame()
+        self._create_sprites()
+
+        hearts_n, explosions = self._sprites_state
+        self.hearts.add(*self.heart_sprites[:hearts_n])
+        for center, size, terminated, index, counter, seq in explosions:
+            explosion = self.explosion_pool.acquire()
+            explosion.reinit(center, size, terminated)
+            explosion.index, explosion.counter, explosion.seq = index, counter, seq
+            explosion.surf = explosion.images[index]
+            self.explosions.add(explosion)
+
+        del self._sprites_state
+
+    def __getstate__(self) -> dict:
+        # Keep the config and the game state but not the pygame resources, 
+        # which are rebuilt lazily after unpickling
+        state = self.__dict__.copy()
+        for name in ("font", "base", "black", "window", "clock",
+                     "tank_engine_sound", "cannon_fire_sound", "explosion_sound",
+                     "hearts", "explosions", "explosion_pool", "heart_sprites"):
+            state.pop(name, None)
+        state["pygame_initialized"] = False
+
+        # An unpickled env that has not rebuilt its sprites yet keeps the
+        # saved state of its sprites, which is already in the copy
+        if self.player is not None and self.hearts is not None:
+            state["_sprites_state"] = (
+                len(self.hearts),
+                [(explosion.rect.center, explosion.size, explosion.terminated,
+                  explosion.index, explosion.counter, explosion.seq)
+                 for explosion in self.explosions],
+            )
 
-        return observation, info
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+
+        self.font = None
+        self.base = None
+        self.black = None
+        self.window = None
+        self.clock = None
+        self.hearts = None
+
+    def _scaled(self, value: float) -> int:
+        """
+        An internal function that maps a length or a coordinate in the 
+        window to the rendered frames.
+        """
+
+        return round(value * self.render_scale)
+
+    def _next_sprite_seq(self) -> int:
+        """
+        An internal function that returns the drawing order of a new 
+        tank, bullet or explosion.
+        """
+
+        self.sprite_seq += 1
+
+        return self.sprite_seq
 
     def _create_player(self) -> None:
         """
@@ -271,18 +510,14 @@ class TankWar(gym.Env):
         player_start_angle = self.np_random.choice(self.angles)
 
         # Create a new player
-        self.player = Player(
-            window_width=self.window_width,
-            window_height=self.window_height,
-            start_x=player_start_x,
-            start_y=player_start_y,
-            start_angle=player_start_angle,
-            speed=self._fps_to_speed(self.player_speed, self.metadata["render_fps"]),
+        self.player.spawn(
+            center=(player_start_x, player_start_y),
+            angle=player_start_angle,
+            speed=self._fps_to_speed(self.player_speed, self.sim_hz),
+            creation_step=0,
+            seq=self._next_sprite_seq(),
         )
 
-        # Add the new player to self.all_sprites
-        self.all_sprites.add(self.player)
-
     def _score_to_enemy(self, score: int) -> tuple[int, int, float]:
         """
         An internal function that maps the current score to the behaviour 
@@ -306,7 +541,7 @@ class TankWar(gym.Env):
             enemy_n = self.max_enemies
 
         return min(enemy_n, self.max_enemies), \
-               TankWar._fps_to_speed(enemy_speed, self.metadata["render_fps"]), \
+               TankWar._fps_to_speed(enemy_speed, self.sim_hz), \
                enemy_shoot_intvl
 
     def _create_enemy(self) -> tuple[int, float]:
@@ -347,45 +582,64 @@ class TankWar(gym.Env):
                     )
 
                 # Create a new enemy
-                enemy = Enemy(
-                    window_width=self.window_width,
-                    window_height=self.window_height,
-                    start_x=enemy_start_x,
-                    start_y=enemy_start_y,
-                    start_angle=new_enemy_start_angle,
+                enemy = self.enemies.spawn(
+                    center=(enemy_start_x, enemy_start_y),
+                    angle=new_enemy_start_angle,
                     speed=enemy_speed,
                     creation_step=self.steps,
+                    seq=self._next_sprite_seq(),
                 )
 
                 # Check if the new enemy collides with the player or
                 # other enemies
-                if not (pygame.sprite.collide_rect(enemy, self.player) or
-                        pygame.sprite.spritecollideany(enemy, self.enemies)):
+                enemy_rect = self.enemies.rect(enemy)
+                if not (self.player.collide(enemy_rect) or
+                        [other for other in self.enemies.collide(enemy_rect) if other != enemy]):
                     overlapped = False
-
-            # Add the new enemy to self.enemies and self.all_sprites
-            self.enemies.add(enemy)
-            self.all_sprites.add(enemy)
+                else:
+                    self.enemies.kill(enemy)
 
         return enemy_speed, enemy_shoot_intvl
 
-    def _create_explosion(self, obj, terminated=False):
+    def _create_explosion(self, movables, slot: int, terminated=False):
         """
-        An internal function that creates explosion animation at a given location.
+        An internal function that creates explosion animation at the 
+        location of a tank or a bullet.
         """
-        explosion = Explosion(obj, terminated)
+        if self.headless:
+            return
+
+        explosion = self.explosion_pool.acquire()
+        if explosion is None:
+            # Recycle the oldest explosion if all explosions are in use
+            explosion = self.explosions.sprites()[0]
+            explosion.kill()
+
+        if isinstance(movables, TankStore):
+            size = Explosion.tank_size
+        else:
+            size = Explosion.bullet_size
+
+        # The explosions only exist in the rendered frames, so they are 
+        # placed at the rendering scale
+        center_x, center_y = movables.center(slot)
+        explosion.reinit(
+            (self._scaled(center_x), self._scaled(center_y)),
+            (self._scaled(size[0]), self._scaled(size[1])),
+            terminated,
+        )
+        explosion.seq = self._next_sprite_seq()
         self.explosions.add(explosion)
-        self.all_sprites.add(explosion)
 
     @staticmethod
-    def _fps_to_speed(original_speed: int, render_fps: int) -> int:
+    def _fps_to_speed(original_speed: int, sim_hz: int) -> int:
         """
         An internal function that converts the original speed,
-        which was based on a framerate of 30, to a speed that fits
-        any framerate.
+        which was based on a tick rate of 30, to a speed that fits
+        any tick rate.
         """
 
-        return 30 * original_speed // render_fps
+        return 30 * original_speed // sim_hz
 
     @staticmethod
     def _angle_to_dir(angle: int) -> tuple[int, int]:
@@ -408,19 +662,70 @@ class TankWar(gym.Env):
 
         return (abs(x1 - x2) ** p + abs(y1 - y2) ** p) ** (1 / p)
 
+    def _sound_on(self) -> bool:
+        """An internal function that returns whether sound effects are played."""
+
+        return self.pygame_initialized and self.render_mode == "human" and not self.headless
+
     def step(self, action: int | None):
+        if self.hearts is None:
+            self._restore_sprites()
+
+        reward, terminated, bullet_lifetime = self._simulate(action)
+
+        observation = self._get_observation()
+
+        # Create a placeholder for additional information. The reward 
+        # breakdown is copied as it is overwritten in every step.
+        info = {"score": self.score, "steps": self.steps, "bullet lifetime": bullet_lifetime,
+                "reward breakdown": self.reward_breakdown.copy()}
+
+        if self.render_mode == "human":
+            self._render_frame(terminated)
+
+        # print(reward) if reward != 0 else None  # For testing purposes
+
+        return observation, reward, terminated, False, info
+
+    def _reward_on(self, term: int) -> bool:
+        """An internal function that returns whether a term of the reward is enabled."""
+
+        return self.reward_weights[term] != 0
+
+    def _add_reward(self, term: int, value: float) -> float:
+        """
+        An internal function that weights a term of the reward, records it 
+        in the reward breakdown and returns it.
+        """
+
+        value = self.reward_weights[term] * value
+        self.reward_breakdown[term] += value
+
+        return value
+
+    def _simulate(self, action: int | None) -> tuple[float, bool, int | None]:
+        """
+        An internal function that advances the game by one step and 
+        returns the reward, whether the episode is terminated and the 
+        lifetime of the player's bullet that hits an enemy.
+        """
+
         self.steps += 1
-        reward = 0.1 * np.sqrt(self.steps)
+        self.reward_breakdown.fill(0)
+        reward = 0
         terminated = False
 
-        if self.pygame_initialized and self.render_mode == "human":
+        if self._reward_on(_SURVIVAL):
+            reward += self._add_reward(_SURVIVAL, 0.1 * np.sqrt(self.steps))
+
+        if self._sound_on():
             # Set the player's engine sound volume to normal
             self.tank_engine_sound.set_volume(0.4)
 
         """Step 1: Move the player according to the action"""
         player_shoot = False
         if action is not None:
-            player_dx, player_dy, player_new_angle = 0, 0, self.player.angle
+            player_dx, player_dy, player_new_angle = 0, 0, int(self.player.angle[0])
 
             if action == 0 or action == 5:  # Move up
                 player_dy = -1
@@ -448,27 +753,29 @@ class TankWar(gym.Env):
             if action != 4 and action != 9:
                 # Update the player's location
                 touches_border, _ = self.player.update(
+                    slot=0,
                     dx=player_dx,
                     dy=player_dy,
                     new_angle=player_new_angle
                 )
 
-                if self.pygame_initialized and self.render_mode == "human":
+                if self._sound_on():
                     # Make the player's engine sound louder
                     self.tank_engine_sound.set_volume(0.9)
 
                 # Get penalty if the player keeps touching border
-                if touches_border:
-                    reward += self.player_on_border_reward * np.sqrt(self.steps)
+                if touches_border and self._reward_on(_BORDER):
+                    reward += self._add_reward(
+                        _BORDER, self.player_on_border_reward * np.sqrt(self.steps))
 
             """
             Step 2: Shoot a bullet from the player's location if player_shoot 
             is true
             """
             if player_shoot:
-                self._player_shoot(angle=self.player.angle)
+                self._player_shoot(angle=int(self.player.angle[0]))
 
-        player_x, player_y = self.player.rect.center
+        player_x, player_y = self.player.center(0)
 
         """Step 3: Create sufficient enemies based on self._score_to_enemy()"""
 
@@ -476,179 +783,187 @@ class TankWar(gym.Env):
 
         """Step 4: Move the enemies and let them shoot"""
 
+        self.enemies.speed[self.enemies.slots] = enemy_speed
+
+        # The player's bullets do not move until Step 6
+        if self._reward_on(_BULLET_NEAR_ENEMY):
+            player_bullet_centers = self.player_bullets.centers()
+
         for enemy in self.enemies:
-            enemy.speed = enemy_speed
-            enemy_dx, enemy_dy, enemy_new_angle = 0, 0, enemy.angle
-            enemy_x, enemy_y = enemy.rect.center
+            enemy_angle = int(self.enemies.angle[enemy])
+            enemy_dx, enemy_dy, enemy_new_angle = 0, 0, enemy_angle
+            enemy_x, enemy_y = self.enemies.center(enemy)
 
             # Rotates an enemy with an interval of not less than 2 seconds 
             # and a probability of 2% (based on a framerate of 30)
             if self.difficulty == 0:
-                if (self.steps - enemy.last_rotate >= self.metadata["render_fps"] * 2 and
-                        self.np_random.random() < self._fps_to_prob(0.02, self.metadata["render_fps"])):
+                if (self.steps - self.enemies.last_rotate[enemy] >= self.sim_hz * 2 and
+                        self.np_random.random() < self._fps_to_prob(0.02, self.sim_hz)):
                     enemy_new_angle = self.np_random.choice(
-                        [angle for angle in self.angles if angle != enemy.angle]
+                        [angle for angle in self.angles if angle != enemy_angle]
                     )
-                    enemy.last_rotate = self.steps
+                    self.enemies.last_rotate[enemy] = self.steps
 
             # Rotates an enemy with an interval of not less than 1 seconds
             # and a probability of 2% (based on a framerate of 30)
             # Improves rotation AI of enemy
             elif self.difficulty == 1:
-                if (self.steps - enemy.last_rotate >= self.metadata["render_fps"] * 1 and
-                        self.np_random.random() < self._fps_to_prob(0.02, self.metadata["render_fps"])):
+                if (self.steps - self.enemies.last_rotate[enemy] >= self.sim_hz * 1 and
+                        self.np_random.random() < self._fps_to_prob(0.02, self.sim_hz)):
                     dir_inx = np.argmax([abs(player_y - enemy_y), abs(player_x - enemy_x)])
                     # print([abs(player_x - enemy_x), abs(player_y - enemy_y)])
                     enemy_new_angle = 90 * dir_inx + \
                                       90 * (np.sign([(player_y - enemy_y), (player_x - enemy_x)])[dir_inx] + 1)
-                    enemy.last_rotate = self.steps
+                    self.enemies.last_rotate[enemy] = self.steps
                     # print(enemy_new_angle)
 
             enemy_dx, enemy_dy = self._angle_to_dir(enemy_new_angle)
 
             # Update the enemy's location
-            enemy_touches_border, enemy_correction_angles = enemy.update(
+            enemy_touches_border, enemy_correction_angles = self.enemies.update(
+                slot=enemy,
                 dx=enemy_dx,
                 dy=enemy_dy,
                 new_angle=enemy_new_angle
             )
 
             # Get penalty of the player is too close to the enemy
-            distance = self._get_distance(2, enemy_x, enemy_y, player_x, player_y)
-            if distance < 100:
-                reward += -1000 / distance / len(self.enemies)
+            if self._reward_on(_ENEMY_PROXIMITY):
+                distance = self._get_distance(2, enemy_x, enemy_y, player_x, player_y)
+                if distance < 100:
+                    reward += self._add_reward(
+                        _ENEMY_PROXIMITY, -1000 / distance / len(self.enemies))
 
             # Get reward if the bullet shot by player is close to the enemy
-            for bullet in self.player_bullets:
-                distance = self._get_distance(2, bullet.rect.centerx, bullet.rect.centery, enemy_x, enemy_y)
-                if 0 < distance < 50:
-                    reward += 100 / distance
+            if self._reward_on(_BULLET_NEAR_ENEMY):
+                for bullet_x, bullet_y in player_bullet_centers:
+                    distance = self._get_distance(2, bullet_x, bullet_y, enemy_x, enemy_y)
+                    if 0 < distance < 50:
+                        reward += self._add_reward(_BULLET_NEAR_ENEMY, 100 / distance)
 
             # Get reward if the direction of player shoot is towards the enemy. Get penalty otherwise.
-            if player_shoot:
+            if player_shoot and self._reward_on(_SHOOT_DIRECTION):
                 angles = (np.sign([enemy_y - player_y, enemy_x - player_x]) + 1) * 90 + np.array([0, 90])
-                if self.player.angle in angles:
-                    reward += self.player_shoot_reward
+                if self.player.angle[0] in angles:
+                    reward += self._add_reward(_SHOOT_DIRECTION, self.player_shoot_reward)
                 else:
-                    reward += -self.player_shoot_reward
+                    reward += self._add_reward(_SHOOT_DIRECTION, -self.player_shoot_reward)
 
             # Ensure the enemy does not stuck at the border by 
             # reversing its direction
             if enemy_touches_border:
                 enemy_new_angle = self.np_random.choice(enemy_correction_angles)
-                enemy.update(0, 0, enemy_new_angle)
-                enemy.last_rotate = self.steps
+                self.enemies.update(enemy, 0, 0, enemy_new_angle)
+                self.enemies.last_rotate[enemy] = self.steps
 
             # Shoot a bullet from the enemy's location
-            self._enemy_shoot(enemy, enemy.angle, enemy_shoot_intvl)
+            self._enemy_shoot(enemy, int(self.enemies.angle[enemy]), enemy_shoot_intvl)
 
         """
         Step: 5 Handle situations where two enemies collide with 
         each other
         """
 
-        enemy_collision = pygame.sprite.groupcollide(
-            self.enemies, self.enemies, dokilla=False, dokillb=False
-        )
         collided_enemies = []
-        for target, enemies in enemy_collision.items():
+        for target in self.enemies:
+            # Every enemy collides with itself
+            enemies = self.enemies.collide(self.enemies.rect(target))
             if len(enemies) > 1:
                 for enemy in enemies:
-                    if enemy is not target:
+                    if enemy != target:
                         collided_enemies.append(enemy)
 
         for enemy in collided_enemies:
             # Reverse the directions of two enemies when they collide 
             # with each other
-            enemy_dx, enemy_dy = self._angle_to_dir(enemy.angle)
-            enemy.update(-enemy_dx * 2, -enemy_dy * 2, enemy.angle)
+            enemy_angle = int(self.enemies.angle[enemy])
+            enemy_dx, enemy_dy = self._angle_to_dir(enemy_angle)
+            self.enemies.update(enemy, -enemy_dx * 2, -enemy_dy * 2, enemy_angle)
             enemy_new_angle = self.np_random.choice(
-                [angle for angle in self.angles if angle != enemy.angle]
+                [angle for angle in self.angles if angle != enemy_angle]
             )
             enemy_dx, enemy_dy = self._angle_to_dir(enemy_new_angle)
-            enemy.update(enemy_dx * 1, enemy_dy * 1, enemy_new_angle)
-            enemy.last_rotate = self.steps
+            self.enemies.update(enemy, enemy_dx * 1, enemy_dy * 1, enemy_new_angle)
+            self.enemies.last_rotate[enemy] = self.steps
 
         """Step 6: Move the player's and enemies' bullets"""
 
         for bullets in (self.player_bullets, self.enemy_bullets):
-            for bullet in bullets:
-                bullet.move()
-
-                # Remove the bullet if it is outside the window
-                if (bullet.rect.right < 0 or
-                        bullet.rect.left > self.window_width or
-                        bullet.rect.bottom <= 0 or
-                        bullet.rect.top >= self.window_height):
-                    bullet.kill()
-                    if bullets == self.player_bullets:
-                        reward += self.player_miss_reward
+            # Remove the bullets that are outside the window
+            for bullet in bullets.move():
+                bullets.kill(bullet)
+                if bullets is self.player_bullets and self._reward_on(_MISS):
+                    reward += self._add_reward(_MISS, self.player_miss_reward)
 
         # Get penalty if the player is too close to the enemy bullets
-        for bullet in self.enemy_bullets:
-            distance = self._get_distance(2, bullet.rect.centerx, bullet.rect.centery, player_x, player_y)
-            if 0 < distance < 50:
-                reward += -1000 / distance / len(self.enemy_bullets)
+        if self._reward_on(_ENEMY_BULLET_PROXIMITY):
+            for bullet_x, bullet_y in self.enemy_bullets.centers():
+                distance = self._get_distance(2, bullet_x, bullet_y, player_x, player_y)
+                if 0 < distance < 50:
+                    reward += self._add_reward(
+                        _ENEMY_BULLET_PROXIMITY, -1000 / distance / len(self.enemy_bullets))
 
         """Step 7: Remove the player's bullet if it hits an enemy"""
         bullet_lifetime = None
         for bullet in self.player_bullets:
-            enemies_hit = pygame.sprite.spritecollide(
-                bullet,
-                self.enemies,
+            enemies_hit = self.enemies.collide(
+                self.player_bullets.rect(bullet),
                 dokill=True)
             if enemies_hit:
                 for enemy in enemies_hit:
-                    reward += self.enemy_killed_reward * (len(self.enemies) + 1)
+                    if self._reward_on(_KILL):
+                        reward += self._add_reward(
+                            _KILL, self.enemy_killed_reward * (len(self.enemies) + 1))
                     self.score += 1
-                    bullet_lifetime = bullet.lifetime
-                    self._create_explosion(enemy)
-                    # print(f"lifetime: {bullet.lifetime}")
-                    bullet.kill()
+                    bullet_lifetime = int(self.player_bullets.lifetime[bullet])
+                    self._create_explosion(self.enemies, enemy)
+                    # print(f"lifetime: {bullet_lifetime}")
+                    self.player_bullets.kill(bullet)
 
-                if self.pygame_initialized and self.render_mode == "human":
+                if self._sound_on():
                     # Play the explosion sound effect
                     self.explosion_sound.play()
 
         """Step 8: Remove the player's bullet if it hits an enemy's bullet"""
 
         for bullet in self.player_bullets:
-            if pygame.sprite.spritecollide(
-                    bullet,
-                    self.enemy_bullets,
+            if self.enemy_bullets.collide(
+                    self.player_bullets.rect(bullet),
                     dokill=True):
-                self._create_explosion(bullet)
-                bullet.kill()
+                self._create_explosion(self.player_bullets, bullet)
+                self.player_bullets.kill(bullet)
 
         """
         Step 9: Deduct 1 HP if the player has collided with 
         any of the enemies or any of the enemies' bullets, terminate the 
         episode if self.hp == 0
         """
-        killed_by_enemy = bool(pygame.sprite.spritecollide(
-            self.player,
-            self.enemies,
+        player_rect = self.player.rect(0)
+        killed_by_enemy = bool(self.enemies.collide(
+            player_rect,
             dokill=True,
         ))
-        killed_by_bullet = bool(pygame.sprite.spritecollide(
-            self.player,
-            self.enemy_bullets,
+        killed_by_bullet = bool(self.enemy_bullets.collide(
+            player_rect,
             dokill=True,
         ))
         if killed_by_enemy or killed_by_bullet:
-            if killed_by_enemy:
-                reward += self.player_killed_reward / (len(self.enemies) + 1)
-            else:
-                reward += self.player_killed_reward / len(self.enemies) \
-                    if len(self.enemies) != 0 else self.player_killed_reward
+            if self._reward_on(_DEATH):
+                if killed_by_enemy:
+                    reward += self._add_reward(
+                        _DEATH, self.player_killed_reward / (len(self.enemies) + 1))
+                else:
+                    reward += self._add_reward(
+                        _DEATH, self.player_killed_reward / len(self.enemies)
+                        if len(self.enemies) != 0 else self.player_killed_reward)
 
             self.hp -= 1
 
             # Set volume of engine sound to 0
-            if self.pygame_initialized and self.render_mode == "human":
+            if self._sound_on():
                 self.tank_engine_sound.set_volume(0)
 
-            if self.pygame_initialized and self.render_mode == "human":
+            if self._sound_on():
                 # Play the explosion sound effect
                 self.explosion_sound.play()
 
@@ -657,51 +972,40 @@ class TankWar(gym.Env):
             else:
                 # Kill all enemies to ensure the player will not be killed 
                 # at spawn
-                for enemy in self.enemies:
-                    enemy.kill()
+                self.enemies.clear()
 
                 # Remove all bullets to make the window look nice and 
                 # ensure the player will not be killed at spawn
                 for bullets in (self.player_bullets, self.enemy_bullets):
-                    for bullet in bullets:
-                        bullet.kill()
+                    bullets.clear()
 
             # Render the explosion animation
-            self._create_explosion(self.player, terminated)
+            self._create_explosion(self.player, 0, terminated)
             # Kill the player
-            self.player.kill()
+            self.player.kill(0)
             # Respawn the player
             if not terminated:
                 self._create_player()
 
-
             # Remove the leftmost heart
-            self.hearts.sprites()[-1].kill()
+            if not self.headless:
+                self.hearts.sprites()[-1].kill()
 
         """Step 10: Update the explosion animation"""
-        if self.render_mode == "human":
-            self.explosions.update(explosion_speed=self.explosion_speed * self.metadata["render_fps"] / 30)
+        if self.render_mode == "human" and not self.headless:
+            self.explosions.update(explosion_speed=self.explosion_speed * self.sim_hz / 30)
 
-        observation = self._get_observation()
-
-        # Create a placeholder for additional information
-        info = {"score": self.score, "steps": self.steps, "bullet lifetime": bullet_lifetime}
-
-        self._render_frame(terminated)
-
-        # print(reward) if reward != 0 else None  # For testing purposes
-
-        return observation, reward, terminated, False, info
+        return reward, terminated, bullet_lifetime
 
     @staticmethod
-    def _fps_to_prob(original_prob: float, render_fps: int) -> float:
+    def _fps_to_prob(original_prob: float, sim_hz: int) -> float:
         """
         An internal function that converts the original probability, 
-        which was based on a framerate of 30, to a probability that 
-        fits any framerate.
+        which was based on a tick rate of 30, to a probability that 
+        fits any tick rate.
         """
 
-        return 30 * original_prob / render_fps
+        return 30 * original_prob / sim_hz
 
     def _player_shoot(self, angle: int) -> None:
         """
@@ -709,33 +1013,28 @@ class TankWar(gym.Env):
         The player can shoot at the beginning or for every one second.
         """
 
+        player_last_shoot = int(self.player.last_shoot[0])
         if (len(self.player_bullets) < self.max_player_bullets and
-                (self.player.last_shoot == 0 or
-                 self.steps - self.player.last_shoot \
-                 >= self.metadata["render_fps"] \
+                (player_last_shoot == 0 or
+                 self.steps - player_last_shoot \
+                 >= self.sim_hz \
                  * self.player_shoot_intvl)):
-            self.player.last_shoot = self.steps
+            self.player.last_shoot[0] = self.steps
 
             # Create a new bullet for the player
-            player_bullet = self.player.bullet(
-                window_width=self.window_width,
-                window_height=self.window_height,
-                tank_size=self.player.surf.get_size(),
-                tank_center=self.player.rect.center,
+            self.player_bullets.spawn(
+                tank_size=self.player.size(0),
+                tank_center=self.player.center(0),
                 angle=angle,
-                speed=self.player.speed + self._fps_to_speed(3, self.metadata["render_fps"]),
+                speed=int(self.player.speed[0]) + self._fps_to_speed(3, self.sim_hz),
+                seq=self._next_sprite_seq(),
             )
 
-            # Add the player's new bullet to self.player_bullets and 
-            # self.all_sprites
-            self.player_bullets.add(player_bullet)
-            self.all_sprites.add(player_bullet)
-
-            if self.pygame_initialized and self.render_mode == "human":
+            if self._sound_on():
                 # Play the cannon firing sound effect
                 self.cannon_fire_sound.play()
 
-    def _enemy_shoot(self, enemy: Enemy, angle: int, interval: int) -> None:
+    def _enemy_shoot(self, enemy: int, angle: int, interval: int) -> None:
         """
         An internal function that controls how an enemy shoots. 
         It shoots with a predefined interval and 
@@ -743,42 +1042,162 @@ class TankWar(gym.Env):
         """
 
         if (len(self.enemy_bullets) < self.max_enemy_bullets and
-                self.steps - enemy.last_shoot >=
-                self.metadata["render_fps"] * interval and
-                self.np_random.random() < self._fps_to_prob(0.05, self.metadata["render_fps"])):
-            enemy.last_shoot = self.steps
+                self.steps - self.enemies.last_shoot[enemy] >=
+                self.sim_hz * interval and
+                self.np_random.random() < self._fps_to_prob(0.05, self.sim_hz)):
+            self.enemies.last_shoot[enemy] = self.steps
 
             # Create a new bullet for the enemy
-            enemy_bullet = enemy.bullet(
-                window_width=self.window_width,
-                window_height=self.window_height,
-                tank_size=enemy.surf.get_size(),
-                tank_center=enemy.rect.center,
+            self.enemy_bullets.spawn(
+                tank_size=self.enemies.size(enemy),
+                tank_center=self.enemies.center(enemy),
                 angle=angle,
-                speed=enemy.speed + self._fps_to_speed(2, self.metadata["render_fps"]),
+                speed=int(self.enemies.speed[enemy]) + self._fps_to_speed(2, self.sim_hz),
+                seq=self._next_sprite_seq(),
             )
 
-            # Add the enemy's new bullet to self.enemy_bullets and 
-            # self.all_sprites
-            self.enemy_bullets.add(enemy_bullet)
-            self.all_sprites.add(enemy_bullet)
+    def _get_sprites(self) -> list[tuple[int, pygame.Surface, tuple[int, int]]]:
+        """
+        An internal function that builds the drawing order, the Surface
+        and the location of all tanks, bullets and explosions for rendering.
+        """
+
+        scale = self.render_scale
+        sprites = (
+            self.player.sprites(scale) + self.enemies.sprites(scale)
+            + self.player_bullets.sprites(scale) + self.enemy_bullets.sprites(scale)
+            + [(explosion.seq, explosion.surf, explosion.rect.topleft)
+               for explosion in self.explosions]
+        )
+        sprites.sort(key=lambda sprite: sprite[0])
+
+        return sprites
+
+    def _get_state(self) -> tuple:
+        """
+        An internal function that returns a copy of the game state that 
+        the simulation depends on.
+        """
+
+        return (
+            self.steps, self.score, self.hp, self.sprite_seq,
+            self.np_random.bit_generator.state, self.reward_breakdown.copy(),
+            [movables.get_state() for movables in (self.player, self.enemies,
+                                                   self.player_bullets, self.enemy_bullets)],
+        )
+
+    def _set_state(self, state: tuple) -> None:
+        """An internal function that restores the game state from a copy."""
+
+        (self.steps, self.score, self.hp, self.sprite_seq,
+         self.np_random.bit_generator.state, reward_breakdown, movables_states) = state
+        np.copyto(self.reward_breakdown, reward_breakdown)
+        for movables, movables_state in zip((self.player, self.enemies,
+                                             self.player_bullets, self.enemy_bullets),
+                                            movables_states):
+            movables.set_state(movables_state)
+
+    def snapshot(self) -> bytes:
+        """
+        A function that packs the state needed to draw the game into 
+        compact bytes, which can be loaded by another env with the same 
+        settings in another process.
+        """
+
+        arrays = [np.array([self.steps, self.score, self.hp, self.sprite_seq])]
+        for movables in (self.player, self.enemies, self.player_bullets, self.enemy_bullets):
+            for key, value in movables.get_state().items():
+                if key == "slots":
+                    # Pad the slots in the order of creation to the capacity
+                    value = value + [-1] * (movables.capacity - len(value))
+                arrays.append(np.asarray(value))
+
+        return np.concatenate(arrays).astype("<i4").tobytes()
+
+    def load_snapshot(self, snapshot: bytes) -> None:
+        """
+        A function that replaces the game state with a snapshot and draws 
+        it in human mode. The env must be reset before.
+        """
+
+        if self.hearts is None:
+            self._restore_sprites()
+
+        values = np.frombuffer(snapshot, dtype="<i4").astype(np.int64)
+        self.steps, self.score, self.hp, self.sprite_seq = values[:4].tolist()
+        start = 4
+        for movables in (self.player, self.enemies, self.player_bullets, self.enemy_bullets):
+            state = movables.get_state()
+            for key in state:
+                state[key] = values[start:start + movables.capacity]
+                start += movables.capacity
+            state["slots"] = state["slots"][state["slots"] >= 0]
+            movables.set_state(state)
+
+        # Explosions are not part of the snapshot
+        self.explosions.empty()
+        self.hearts.empty()
+        self.hearts.add(*self.heart_sprites[:self.hp])
+
+        if self.render_mode == "human":
+            self._render_frame()
+
+    def rollout(self, action_sequences, discount_factor: float = 0.99
+                ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        A function that simulates K open-loop action sequences of length H 
+        (a K x H array) from the current state without rendering and returns 
+        the discounted return, whether the episode is terminated and the 
+        final score of each sequence. A sequence stops when its episode is
+        terminated. The sequences are simulated one after another, each
+        from a restored copy of the current state, and the state of the
+        env is left untouched.
+        """
+
+        action_sequences = np.asarray(action_sequences, dtype=np.int64)
+        assert action_sequences.ndim == 2
+
+        k = len(action_sequences)
+        returns = np.zeros(k, dtype=np.float64)
+        terminations = np.zeros(k, dtype=bool)
+        scores = np.zeros(k, dtype=np.int64)
+
+        state = self._get_state()
+        self.headless = True
+        try:
+            for i, actions in enumerate(action_sequences.tolist()):
+                self._set_state(state)
+
+                discount = 1.0
+                for action in actions:
+                    reward, terminated, _ = self._simulate(action)
+                    returns[i] += discount * reward
+                    discount *= discount_factor
+                    if terminated:
+                        terminations[i] = True
+                        break
+
+                scores[i] = self.score
+        finally:
+            self.headless = False
+            self._set_state(state)
+
+        return returns, terminations, scores
 
     def render(self) -> np.ndarray | None:
         if self.render_mode == "rgb_array":
             return self._render_frame()
 
-    def _render_frame(self, terminated: bool = False) -> np.ndarray | None:
+    def _init_pygame(self) -> None:
+        """
+        An internal function that initializes pygame and the sound module, 
+        which are shared by all envs in the process, once for this env.
+        """
+
         if not self.pygame_initialized:
-            # Initialize pygame
-            pygame.init()
+            # Initialize pygame and the sound module in human mode
+            SharedPygame.acquire(sound=self.render_mode == "human")
             if self.render_mode == "human":
-                # Initialize sound module
-                pygame.mixer.init()
-
-                # Load and play the background music
-                pygame.mixer.music.load(Audios.background_music)
-                pygame.mixer.music.play(loops=-1)
-
                 # Load and keep looping the tank engine sound effect
                 self.tank_engine_sound = pygame.mixer.Sound(Audios.tank_engine_sound)
                 self.tank_engine_sound.set_volume(0)
@@ -793,11 +1212,15 @@ class TankWar(gym.Env):
 
             self.pygame_initialized = True
 
+    def _render_frame(self, terminated: bool = False) -> np.ndarray | None:
+        self._init_pygame()
+
+        if self.hearts is None:
+            self._restore_sprites()
+
         if self.window is None and self.render_mode == "human":
-            pygame.display.init()
-            pygame.display.set_caption("Tank War")
-            self.window = pygame.display.set_mode(
-                (self.window_width, self.window_height)
+            self.window = SharedPygame.open_window(
+                (self.canvas_width, self.canvas_height)
             )
 
         if self.clock is None and self.render_mode == "human":
@@ -805,27 +1228,26 @@ class TankWar(gym.Env):
 
         if self.font is None:
             # Initialize the font
-            self.font = pygame.font.SysFont("Garamond", 25)
+            self.font = SharedPygame.font(self._scaled(25))
 
-        if self.background is None:
-            # Load the background
-            self.background = Background()
+        if self.base is None:
+            # Composite the white fill and the partially transparent 
+            # background once into a static layer that each frame starts from
+            self.base = pygame.Surface((self.canvas_width, self.canvas_height))
+            self.base.fill((255, 255, 255))
+            self.base.blit(Background(self.render_scale).surf, (0, 0))
 
         if self.black is None:
             # Load the black image
-            self.black = Black()
-
-        # Create a surface to hold all elements
-        canvas = pygame.Surface((self.window_width, self.window_height))
-        canvas.fill((255, 255, 255))
+            self.black = Black(self.render_scale)
 
-        # Set the background
-        canvas.blit(self.background.surf, (0, 0))
+        # Create a surface to hold all elements from the static layer
+        canvas = self.base.copy()
 
         if self.steps != 0:
-            # Draw all sprites
-            for sprite in self.all_sprites:
-                canvas.blit(sprite.surf, sprite.rect)
+            # Draw all tanks, bullets and explosions in the order of creation
+            for _, surf, location in self._get_sprites():
+                canvas.blit(surf, location)
 
             # Draw all hearts
             for heart in self.hearts:
@@ -833,34 +1255,35 @@ class TankWar(gym.Env):
 
             # Display the score on the window
             score_surf = self.font.render(f"Score: {self.score}", True, (0, 0, 0))
-            canvas.blit(score_surf, (5, 5))
+            canvas.blit(score_surf, (self._scaled(5), self._scaled(5)))
 
             # Display the duration of game on the window
-            duration_total = self.steps // self.metadata["render_fps"]
+            duration_total = self.steps // self.sim_hz
             duration_min = duration_total // 60
             duration_sec = duration_total - duration_min * 60
             time_surf = self.font.render(
                 f"Time: {duration_min:0>2d}:{duration_sec:0>2d}", True, (0, 0, 0)
             )
-            canvas.blit(time_surf, (5, 25))
+            canvas.blit(time_surf, (self._scaled(5), self._scaled(25)))
 
             # Display the player's cannon's remaining reloading time as a
             # shrinking rectangle
-            if self.player.last_shoot != 0:
+            player_last_shoot = int(self.player.last_shoot[0])
+            if player_last_shoot != 0:
                 reload_bar_len = max(
                     0,
-                    80 * (self.metadata["render_fps"] * self.player_shoot_intvl
-                          - (self.steps - self.player.last_shoot))
-                    // (self.metadata["render_fps"] * self.player_shoot_intvl),
+                    80 * (self.sim_hz * self.player_shoot_intvl
+                          - (self.steps - player_last_shoot))
+                    // (self.sim_hz * self.player_shoot_intvl),
                 )
                 pygame.draw.rect(
                     canvas,
                     (230, 230, 230),
                     (
-                        self.window_width - reload_bar_len - 15,
-                        self.window_height - 20,
-                        reload_bar_len,
-                        10,
+                        self.canvas_width - self._scaled(reload_bar_len + 15),
+                        self.canvas_height - self._scaled(20),
+                        self._scaled(reload_bar_len),
+                        self._scaled(10),
                     ),
                 )
 
@@ -872,14 +1295,14 @@ class TankWar(gym.Env):
                 canvas.blit(self.black.surf, (0, 0))
 
                 # "TANK WAR"
-                title_text = pygame.font.SysFont("Garamond", 50).render("TANK WAR", True, (255, 255, 255))
-                title_text_rect = title_text.get_rect(center=(self.window_width / 2, self.window_height / 2 - 20))
+                title_text = SharedPygame.font(self._scaled(50)).render("TANK WAR", True, (255, 255, 255))
+                title_text_rect = title_text.get_rect(center=(self.canvas_width / 2, self.canvas_height / 2 - self._scaled(20)))
                 canvas.blit(title_text, title_text_rect)
 
                 # "Press [Enter] to play"
                 beginning_text = self.font.render("Press [Enter] to play", True, (255, 255, 255))
                 beginning_text_rect = beginning_text.get_rect(
-                    center=(self.window_width / 2, self.window_height / 2 + 20))
+                    center=(self.canvas_width / 2, self.canvas_height / 2 + self._scaled(20)))
                 canvas.blit(beginning_text, beginning_text_rect)
 
             # Ending
@@ -888,42 +1311,55 @@ class TankWar(gym.Env):
                 canvas.blit(self.black.surf, (0, 0))
 
                 # "GAME OVER"
-                ending_text = pygame.font.SysFont("Garamond", 50).render("GAME OVER", True, (255, 255, 255))
-                ending_text_rect = ending_text.get_rect(center=(self.window_width / 2, self.window_height / 2 - 35))
+                ending_text = SharedPygame.font(self._scaled(50)).render("GAME OVER", True, (255, 255, 255))
+                ending_text_rect = ending_text.get_rect(center=(self.canvas_width / 2, self.canvas_height / 2 - self._scaled(35)))
                 canvas.blit(ending_text, ending_text_rect)
 
                 if self.episode != self.episodes:
                     # "Press [R] to restart"
                     ending_text = self.font.render("Press [R] to restart", True, (255, 255, 255))
-                    ending_text_rect = ending_text.get_rect(center=(self.window_width / 2, self.window_height / 2 + 5))
+                    ending_text_rect = ending_text.get_rect(center=(self.canvas_width / 2, self.canvas_height / 2 + self._scaled(5)))
                     canvas.blit(ending_text, ending_text_rect)
 
                 # "Press [Q] or [Esc] to quit"
                 ending_text = self.font.render("Press [Q] or [Esc] to quit", True, (255, 255, 255))
-                ending_text_rect = ending_text.get_rect(center=(self.window_width / 2, self.window_height / 2 + 35))
+                ending_text_rect = ending_text.get_rect(center=(self.canvas_width / 2, self.canvas_height / 2 + self._scaled(35)))
                 canvas.blit(ending_text, ending_text_rect)
 
         if self.render_mode == "human":
             # Draw the canvas to the pygame window
             self.window.blit(canvas, canvas.get_rect())
             pygame.event.pump()
-            pygame.display.update()
 
-            # Ensure the rendering occurs at the predefined framerate
-            self.clock.tick(self.metadata["render_fps"])
+            # Show the step for render_fps / sim_hz frames at the framerate,
+            # so the game runs in real time at any framerate
+            self.frame_credit += self.render_fps / self.sim_hz
+            while self.frame_credit >= 1:
+                pygame.display.update()
+                self.clock.tick(self.render_fps)
+                self.frame_credit -= 1
         else:  # Return an RGB array
             return np.transpose(
                 np.array(pygame.surfarray.pixels3d(canvas)), axes=(1, 0, 2)
             )
 
     def close(self) -> None:
-        if self.window is not None:
-            pygame.display.quit()
-
         if self.pygame_initialized:
-            # Stop and quit the sound module
-            pygame.mixer.music.stop()
-            pygame.mixer.quit()
+            if self.render_mode == "human":
+                # Stop the engine sound effect of this env, which keeps 
+                # looping while other envs use the sound module
+                self.tank_engine_sound.stop()
+
+            # Release the window, the sound module and pygame, which are 
+            # only quit if no other env uses them
+            SharedPygame.release(
+                sound=self.render_mode == "human",
+                window=self.window is not None,
+            )
+
+            self.pygame_initialized = False
+            self.window = None
+            self.clock = None
 
-            # Quit pygame
-            pygame.quit()
+            # The shared fonts may be invalidated once pygame is quit
+            self.font = None
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+import os
+import queue
+import threading
+from collections import deque
+
+import numpy as np
+
+from numpy_policy import NumpyPolicy
+
+
+class Checkpointer:
+    """
+    A class that writes the checkpoints of a model in a background thread,
+    so that training does not wait for the files to be written. Every file
+    is written to a temporary file and then renamed, so a model file is
+    never left half-written, and only the last keep checkpoints are kept.
+    A checkpoint that cannot be written raises its error in the next call
+    of save(), snapshot() or close().
+    """
+
+    def __init__(self, activations: list[str], model=None, keep: int = 0) -> None:
+        self.activations = activations
+
+        # A copy of the Keras model that only the writer thread uses to
+        # write .h5 files, which are not written if it is None
+        self.model = model
+
+        # The number of checkpoints to keep (0 to keep all), and the paths
+        # of the checkpoints written so far
+        self.keep = keep
+        self.paths = deque()
+
+        # The first error of the writer thread that is not raised yet
+        self.error = None
+
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self._write_jobs, daemon=True)
+        self.thread.start()
+
+    def save(self, path: str, weights: list[np.ndarray]) -> None:
+        """
+        A function that writes a checkpoint to path.h5 and path.npz in the
+        background. The weights must not be changed afterwards, which holds
+        for the copies returned by model.get_weights().
+        """
+
+        self._raise_error()
+        self.jobs.put((path, weights, True))
+
+    def snapshot(self, path: str, weights: list[np.ndarray]) -> None:
+        """
+        A function that writes only the weights to path.npz in the
+        background, replacing the previous snapshot at the same path.
+        Snapshots do not count towards the kept checkpoints.
+        """
+
+        self._raise_error()
+        self.jobs.put((path, weights, False))
+
+    def close(self) -> None:
+        """A function that waits for all pending checkpoints to be written."""
+
+        self.jobs.put(None)
+        self.thread.join()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        """An internal function that raises the error of a failed checkpoint once."""
+
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError("A checkpoint could not be written") from error
+
+    def _write_jobs(self) -> None:
+        """An internal function that writes the requested checkpoints in order."""
+
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+
+            path, weights, full = job
+            try:
+                self._write(path, weights, full)
+            except Exception as e:
+                # Keep the first error for the trainer, and remove the
+                # temporary files of the failed checkpoint
+                if self.error is None:
+                    self.error = e
+                for suffix in (".tmp.npz", ".tmp.h5"):
+                    if os.path.isfile(f"{path}{suffix}"):
+                        os.remove(f"{path}{suffix}")
+
+    def _write(self, path: str, weights: list[np.ndarray], full: bool) -> None:
+        """An internal function that writes a checkpoint and removes old ones."""
+
+        NumpyPolicy(weights, self.activations).save(f"{path}.tmp.npz")
+        os.replace(f"{path}.tmp.npz", f"{path}.npz")
+
+        if not full:
+            return
+
+        if self.model is not None:
+            self.model.set_weights(weights)
+            self.model.save(f"{path}.tmp.h5")
+            os.replace(f"{path}.tmp.h5", f"{path}.h5")
+
+        # Checkpoints saved within the same second share a path
+        if path not in self.paths:
+            self.paths.append(path)
+
+        while self.keep and len(self.paths) > self.keep:
+            old_path = self.paths.popleft()
+            for suffix in (".h5", ".npz"):
+                if os.path.isfile(f"{old_path}{suffix}"):
+                    os.remove(f"{old_path}{suffix}")
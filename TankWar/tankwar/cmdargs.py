@@ -36,19 +36,94 @@ parser.add_argument("-teste", "--test_episodes", type=int,
                     help="The number of testing episodes", 
                     default=100)
 parser.add_argument("-ms", "--max_steps", type=int, 
-                    help="The maximum number of steps in an episode when FPS=30",
+                    help="The maximum number of steps in an episode when FPS=30, "
+                         "which is scaled to the same game time at other FPS",
                     default=7200)
 parser.add_argument("-fast", "--fast", action="store_true", 
                     help="Use fast mode to train DQN model in around 20 minutes."
                          "If this argument is specified, -traine need not be specified.")
 parser.add_argument("-fps", "--fps", type=int, 
-                    help="Frames per second (Although possible, it would be "
-                         "better not to use this argument in tankwar_train.py "
-                         "and tankwar_test.py)",
-                    choices=(15, 30, 60), metavar="[15, 30, 60]", 
+                    help="The number of simulation steps per game second (a low "
+                         "value speeds up training in tankwar_train.py at the cost "
+                         "of coarser movement)",
+                    choices=(10, 15, 30, 60), metavar="[10, 15, 30, 60]", 
                     default=30)
+parser.add_argument("-rfps", "--render_fps", type=int,
+                    help="The framerate of the window in human mode, which does "
+                         "not change the game speed or the simulation",
+                    default=60)
 parser.add_argument("-f", "--file", type=str, 
-                    help="The file name of the HDF5 model file (without .h5 suffix)",
+                    help="The file name of the model file in the models folder "
+                         "(without .npz or .h5 suffix), which plays the game in "
+                         "tankwar_play.py if specified",
                     default=None)
+parser.add_argument("-gf", "--golden_file", type=str,
+                    help="The file name of the golden trace file in the golden "
+                         "folder (without .npz suffix)",
+                    default="golden_traces")
+parser.add_argument("-rec", "--record", action="store_true",
+                    help="Record the golden traces of the current build instead of "
+                         "checking the current build against them")
+parser.add_argument("-rt", "--round_trip", action="store_true",
+                    help="Pickle and unpickle every env twice halfway through its "
+                         "case when checking the golden traces")
+parser.add_argument("-ss", "--soak_steps", type=int,
+                    help="The number of steps in a memory soak test",
+                    default=1_000_000)
+parser.add_argument("-si", "--sample_interval", type=int,
+                    help="The number of steps between two memory samples in a "
+                         "memory soak test",
+                    default=10_000)
+parser.add_argument("-mg", "--max_growth", type=float,
+                    help="The maximum memory growth (in MB) per 100000 steps "
+                         "allowed in a memory soak test",
+                    default=1.0)
+parser.add_argument("-st", "--soak_trainer", action="store_true",
+                    help="Drive the DQN trainer instead of random actions in a "
+                         "memory soak test")
+parser.add_argument("-per", "--prioritized", action="store_true",
+                    help="Sample the replay memory in tankwar_train.py by the TD "
+                         "errors of transitions (prioritized experience replay) "
+                         "instead of uniformly")
+parser.add_argument("-eager", "--eager_train", action="store_true",
+                    help="Train with model.predict and model.fit in tankwar_train.py "
+                         "instead of the compiled training step")
+parser.add_argument("-tenv", "--train_envs", type=int,
+                    help="The number of envs that tankwar_train.py steps in "
+                         "parallel, with one batched action selection per step",
+                    default=1)
+parser.add_argument("-act", "--actors", type=int,
+                    help="The number of actor processes that play for the learner "
+                         "in tankwar_train.py (0 to train in a single process)",
+                    default=0)
+parser.add_argument("-kc", "--keep_checkpoints", type=int,
+                    help="The number of latest checkpoints that tankwar_train.py "
+                         "keeps in the models folder (0 to keep all)",
+                    default=10)
+parser.add_argument("-sne", "--snapshot_every", type=int,
+                    help="The number of training episodes between two weights-only "
+                         "snapshots, which replace models/model_d_DIFFICULTY[_fast]_latest.npz "
+                         "(0 for no snapshots)",
+                    default=0)
+parser.add_argument("-ne", "--num_envs", type=int,
+                    help="The number of envs hosted by the env server",
+                    default=16)
+parser.add_argument("-addr", "--address", type=str,
+                    help="The address of the env server, either HOST:PORT for TCP "
+                         "or the path of a Unix domain socket",
+                    default="localhost:8700")
+parser.add_argument("-spec", "--spectate", action="store_true",
+                    help="Send snapshots of the game in tankwar_train.py to "
+                         "tankwar_spectate.py, which draws them in its own window")
+parser.add_argument("-sa", "--spectator_address", type=str,
+                    help="The UDP address HOST:PORT of the spectator",
+                    default="localhost:8701")
+parser.add_argument("-se", "--spectate_every", type=int,
+                    help="The number of steps between two snapshots sent to the "
+                         "spectator",
+                    default=4)
 args = parser.parse_args()
+
+# The maximum number of steps in an episode at the tick rate of FPS
+max_episode_steps = args.max_steps * args.fps // 30
 print(args)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+import json
+import os
+
+import numpy as np
+
+# The activations of the Dense layers that the forward pass supports
+_activations = {
+    "relu": lambda x: np.maximum(x, 0, out=x),
+    "linear": lambda x: x,
+}
+
+
+def model_path(file: str) -> str:
+    """
+    A function that returns the path of a model file in the models folder,
+    preferring the .npz file exported by tankwar_train.py to the HDF5 file.
+    """
+
+    path = os.path.join("models", f"{file}.npz")
+    if os.path.isfile(path):
+        return path
+
+    return os.path.join("models", f"{file}.h5")
+
+
+class NumpyPolicy:
+    """
+    A greedy policy that picks actions with a NumPy forward pass over
+    the cached weights of a Dense-only Keras model, which is much faster
+    than model.predict for a single state. Saved models can be loaded
+    without TensorFlow.
+    """
+
+    def __init__(self, weights: list[np.ndarray], activations: list[str]) -> None:
+        self.activations = activations
+        self.set_weights(weights)
+
+    @classmethod
+    def from_keras(cls, model) -> "NumpyPolicy":
+        """A function that creates a policy from a Keras model of Dense layers."""
+
+        activations = [layer.activation.__name__ for layer in model.layers]
+        for activation in activations:
+            assert activation in _activations, f"Unsupported activation {activation}"
+
+        return cls(model.get_weights(), activations)
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyPolicy":
+        """
+        A function that loads a policy from a .npz file exported by save()
+        or from a Keras HDF5 model file, which needs h5py but not TensorFlow.
+        """
+
+        if os.path.splitext(path)[1] == ".npz":
+            with np.load(path) as data:
+                n_layers = len(data["activations"])
+                weights = []
+                for i in range(n_layers):
+                    weights.extend((data[f"kernel_{i}"], data[f"bias_{i}"]))
+                return cls(weights, data["activations"].tolist())
+
+        # Import h5py only when needed as .npz files do not need it
+        import h5py
+
+        def decode(value) -> str:
+            return value.decode() if isinstance(value, bytes) else value
+
+        with h5py.File(path, "r") as f:
+            # The activations are only in the JSON config of the model
+            config = json.loads(decode(f.attrs["model_config"]))
+            activations = [layer["config"]["activation"]
+                           for layer in config["config"]["layers"]
+                           if layer["class_name"] == "Dense"]
+
+            # The weights are stored by layer in the order of the layers
+            model_weights = f["model_weights"]
+            weights = []
+            for layer_name in model_weights.attrs["layer_names"]:
+                layer = model_weights[decode(layer_name)]
+                weights.extend(layer[decode(weight_name)][()]
+                               for weight_name in layer.attrs["weight_names"])
+
+        for activation in activations:
+            assert activation in _activations, f"Unsupported activation {activation}"
+
+        return cls(weights, activations)
+
+    def save(self, path: str) -> None:
+        """A function that exports the weights and activations to a .npz file."""
+
+        arrays = {}
+        for i, (kernel, bias, _) in enumerate(self.layers):
+            arrays[f"kernel_{i}"] = kernel
+            arrays[f"bias_{i}"] = bias
+
+        np.savez(path, activations=np.array(self.activations), **arrays)
+
+    def set_weights(self, weights: list[np.ndarray]) -> None:
+        """
+        A function that caches the kernels and biases of all layers, which
+        must be called again whenever the weights of the model change.
+        """
+
+        self.layers = [
+            (np.ascontiguousarray(kernel, dtype=np.float32),
+             np.asarray(bias, dtype=np.float32), _activations[activation])
+            for kernel, bias, activation in zip(weights[::2], weights[1::2], self.activations)
+        ]
+
+    def q_values(self, states: np.ndarray) -> np.ndarray:
+        """
+        A function that returns the Q-values of all actions in a state, or
+        in each row of a batch of states.
+        """
+
+        x = np.asarray(states, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            x = activation(x @ kernel + bias)
+
+        return x
+
+    def act(self, state: np.ndarray) -> int:
+        """A function that returns the action with the largest Q-value."""
+
+        return int(np.argmax(self.q_values(state)))
+
+    def act_batch(self, states: np.ndarray) -> np.ndarray:
+        """A function that returns the actions with the largest Q-values of a batch."""
+
+        return np.argmax(self.q_values(states), axis=-1)
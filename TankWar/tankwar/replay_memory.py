@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+
+import numpy as np
+
+
+class ReplayMemory:
+    """
+    A fixed-sized replay memory that stores states, actions, rewards, new
+    states and terminated flags in preallocated NumPy arrays. When the
+    memory is full, the oldest transition is overwritten.
+    """
+
+    def __init__(self, capacity: int, state_shape: tuple[int, ...],
+                 state_dtype: np.dtype = np.float32, seed: int | None = None) -> None:
+        self.capacity = capacity
+
+        self.states = np.zeros((capacity, *state_shape), dtype=state_dtype)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float64)
+        self.new_states = np.zeros((capacity, *state_shape), dtype=state_dtype)
+        self.terminated = np.zeros(capacity, dtype=bool)
+
+        # The slot that the next transition is written to
+        self.next_slot = 0
+        self.size = 0
+
+        # The number of transitions ever stored, which is also the id of
+        # the next transition
+        self.count = 0
+
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, state: np.ndarray, action: int, reward: float,
+               new_state: np.ndarray, terminated: bool) -> None:
+        """A function that stores a transition, overwriting the oldest one if full."""
+
+        slot = self.next_slot
+        self.states[slot] = state
+        self.actions[slot] = action
+        self.rewards[slot] = reward
+        self.new_states[slot] = new_state
+        self.terminated[slot] = terminated
+
+        self.next_slot = (slot + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.count += 1
+
+    def extend(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+               new_states: np.ndarray, terminated: np.ndarray) -> np.ndarray:
+        """
+        A function that stores a batch of transitions at once and returns 
+        their ids, which index() maps back to the transitions.
+        """
+
+        n = len(actions)
+        assert n <= self.capacity, "The batch is larger than the replay memory"
+
+        slots = (self.next_slot + np.arange(n)) % self.capacity
+        self.states[slots] = states
+        self.actions[slots] = actions
+        self.rewards[slots] = rewards
+        self.new_states[slots] = new_states
+        self.terminated[slots] = terminated
+
+        ids = np.arange(self.count, self.count + n)
+        self.next_slot = (self.next_slot + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+        self.count += n
+
+        return ids
+
+    def index(self, transition_id: int) -> int:
+        """
+        A function that maps the id of a transition to its index counted 
+        from the newest transition, which is negative.
+        """
+
+        return transition_id - self.count
+
+    def clear(self) -> None:
+        """A function that removes all transitions."""
+
+        self.next_slot = 0
+        self.size = 0
+
+    def _slot(self, index: int) -> int:
+        """
+        An internal function that maps an index counted from the oldest
+        transition (or from the newest if negative) to a slot.
+        """
+
+        if not -self.size <= index < self.size:
+            raise IndexError("Replay memory index out of range")
+
+        if index < 0:
+            index += self.size
+
+        return (self.next_slot - self.size + index) % self.capacity
+
+    def get_reward(self, index: int) -> float:
+        """A function that returns the reward of a transition by index."""
+
+        return float(self.rewards[self._slot(index)])
+
+    def set_reward(self, index: int, reward: float) -> None:
+        """A function that replaces the reward of a transition by index."""
+
+        self.rewards[self._slot(index)] = reward
+
+    def add_reward(self, index: int, reward: float) -> None:
+        """A function that adds to the reward of a transition by index."""
+
+        self.rewards[self._slot(index)] += reward
+
+    def sample(self, batch_size: int
+               ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        A function that samples distinct transitions and returns their
+        states, actions, rewards, new states and terminated flags as
+        contiguous arrays.
+        """
+
+        return self.batch(self.sample_slots(batch_size))
+
+    def sample_slots(self, batch_size: int) -> np.ndarray:
+        """A function that samples the slots of distinct transitions uniformly."""
+
+        return self.rng.choice(self.size, batch_size, replace=False)
+
+    def batch(self, slots: np.ndarray
+              ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        A function that returns the states, actions, rewards, new states and 
+        terminated flags of the transitions in slots as contiguous arrays.
+        """
+
+        return (self.states[slots], self.actions[slots], self.rewards[slots],
+                self.new_states[slots], self.terminated[slots])
+
+
+class PrioritizedReplayMemory(ReplayMemory):
+    """
+    A replay memory that samples transitions in proportion to their
+    priorities, which are the absolute TD errors raised to the power of
+    alpha. The priorities are kept in an array-based sum-tree, so sampling
+    and updating a batch take O(log n) steps of vectorized operations.
+    """
+
+    def __init__(self, capacity: int, state_shape: tuple[int, ...],
+                 state_dtype: np.dtype = np.float32, seed: int | None = None,
+                 alpha: float = 0.6, epsilon: float = 1e-3) -> None:
+        super().__init__(capacity, state_shape, state_dtype, seed)
+
+        self.alpha = alpha
+
+        # A small priority so that every transition can be sampled again
+        self.epsilon = epsilon
+
+        # The sum-tree is stored like a binary heap: node i has the children
+        # 2i and 2i + 1, node 1 is the root, and the leaves are the last
+        # half of the array, padded with zeros to a power of 2
+        self.leaves = 1 << max(capacity - 1, 1).bit_length()
+        self.depth = self.leaves.bit_length() - 1
+        self.tree = np.zeros(2 * self.leaves, dtype=np.float64)
+
+        # New transitions get the maximum priority so that they are
+        # sampled at least once
+        self.max_priority = 1.0
+
+    def append(self, state: np.ndarray, action: int, reward: float,
+               new_state: np.ndarray, terminated: bool) -> None:
+        slot = self.next_slot
+        super().append(state, action, reward, new_state, terminated)
+        self._set_priorities(np.array([slot]), np.array([self.max_priority]))
+
+    def extend(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+               new_states: np.ndarray, terminated: np.ndarray) -> np.ndarray:
+        slots = (self.next_slot + np.arange(len(actions))) % self.capacity
+        ids = super().extend(states, actions, rewards, new_states, terminated)
+        self._set_priorities(slots, np.full(len(slots), self.max_priority))
+
+        return ids
+
+    def clear(self) -> None:
+        super().clear()
+        self.tree.fill(0)
+
+    def add_reward(self, index: int, reward: float) -> None:
+        super().add_reward(index, reward)
+
+        # A transition that is credited later must be learned again
+        self._set_priorities(np.array([self._slot(index)]), np.array([self.max_priority]))
+
+    def _set_priorities(self, slots: np.ndarray, priorities: np.ndarray) -> None:
+        """
+        An internal function that sets the priorities of the leaves and
+        updates the sums of their ancestors level by level.
+        """
+
+        nodes = slots + self.leaves
+        self.tree[nodes] = priorities
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def sample_slots(self, batch_size: int) -> np.ndarray:
+        """
+        A function that samples one slot from each of batch_size equal
+        segments of the total priority.
+        """
+
+        total = self.tree[1]
+        targets = (np.arange(batch_size) + self.rng.random(batch_size)) * (total / batch_size)
+
+        # Descend from the root to the leaves for all targets at once
+        nodes = np.ones(batch_size, dtype=np.int64)
+        for _ in range(self.depth):
+            left = self.tree[2 * nodes]
+            go_right = targets >= left
+            targets = np.where(go_right, targets - left, targets)
+            nodes = 2 * nodes + go_right
+
+        # Rounding can reach a padded leaf past the last transition
+        return np.minimum(nodes - self.leaves, self.size - 1)
+
+    def weights(self, slots: np.ndarray, beta: float) -> np.ndarray:
+        """
+        A function that returns the importance-sampling weights of the
+        sampled slots, normalized so that the largest weight is 1.
+        """
+
+        probabilities = self.tree[slots + self.leaves] / self.tree[1]
+        weights = (self.size * probabilities) ** -beta
+
+        return weights / weights.max()
+
+    def update_priorities(self, slots: np.ndarray, td_errors: np.ndarray) -> None:
+        """A function that sets the priorities of the slots from their TD errors."""
+
+        priorities = (np.abs(td_errors) + self.epsilon) ** self.alpha
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self._set_priorities(slots, priorities)
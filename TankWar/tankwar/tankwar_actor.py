@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+
+from time import sleep
+
+import gym
+import gym_tankwar
+import numpy as np
+
+from numpy_policy import NumpyPolicy
+from replay_memory import ReplayMemory
+from transition_processor import TransitionProcessor
+
+
+def make_env(max_steps: int, **kwargs) -> gym.Env:
+    """A function that makes a TankWar env whose episodes last at most max_steps steps."""
+
+    env = gym.make("gym_tankwar/TankWar-v0", **kwargs)
+
+    return gym.wrappers.TimeLimit(env, max_episode_steps=max_steps)
+
+
+class StackableInfo(gym.Wrapper):
+    """
+    A wrapper that reports a bullet lifetime of 0 instead of None when no 
+    enemy is hit, so that vector envs can stack the bullet lifetimes of
+    their envs into integer arrays.
+    """
+
+    def step(self, action):
+        observation, reward, terminated, truncated, info = self.env.step(action)
+        if info["bullet lifetime"] is None:
+            info["bullet lifetime"] = 0
+
+        return observation, reward, terminated, truncated, info
+
+
+class WeightBroadcast:
+    """
+    A class that shares the latest weights of a model with other processes
+    through shared memory, together with a version that counts the updates.
+    """
+
+    def __init__(self, weights: list[np.ndarray], ctx) -> None:
+        self.shapes = [weight.shape for weight in weights]
+        self.buffer = ctx.RawArray("f", sum(weight.size for weight in weights))
+        self.version = ctx.Value("q", 0)
+
+        self.publish(weights)
+
+    def publish(self, weights: list[np.ndarray]) -> None:
+        """A function that replaces the shared weights and increases the version."""
+
+        flat = np.frombuffer(self.buffer, dtype=np.float32)
+        with self.version.get_lock():
+            flat[:] = np.concatenate([np.ravel(weight) for weight in weights])
+            self.version.value += 1
+
+    def fetch(self, version: int) -> tuple[int, list[np.ndarray] | None]:
+        """
+        A function that returns the current version and a copy of the
+        shared weights, or None if the version has not changed.
+        """
+
+        if self.version.value == version:
+            return version, None
+
+        with self.version.get_lock():
+            version = self.version.value
+            flat = np.frombuffer(self.buffer, dtype=np.float32).copy()
+
+        weights, start = [], 0
+        for shape in self.shapes:
+            size = int(np.prod(shape))
+            weights.append(flat[start:start + size].reshape(shape))
+            start += size
+
+        return version, weights
+
+
+class SharedRing:
+    """
+    A class that streams records from one process to another through a ring 
+    buffer in shared memory. Every column of the records is kept in its own 
+    shared array, and the numbers of records written and read so far are 
+    shared counters, so records are copied in chunks without pickling.
+    """
+
+    def __init__(self, capacity: int, columns: dict[str, tuple[tuple[int, ...], type]],
+                 ctx) -> None:
+        self.capacity = capacity
+        self.columns = {name: (tuple(shape), np.dtype(dtype).str)
+                        for name, (shape, dtype) in columns.items()}
+        self.buffers = {
+            name: ctx.RawArray("B", capacity * int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            for name, (shape, dtype) in self.columns.items()
+        }
+        self.written = ctx.Value("q", 0)
+        self.read = ctx.Value("q", 0)
+
+        self.arrays = self._views()
+
+    def __getstate__(self) -> dict:
+        # The views are rebuilt from the shared buffers in the other process
+        state = self.__dict__.copy()
+        del state["arrays"]
+
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.arrays = self._views()
+
+    def _views(self) -> dict[str, np.ndarray]:
+        """An internal function that views the shared buffers as arrays of records"""
+
+        return {
+            name: np.frombuffer(self.buffers[name], dtype=dtype).reshape((self.capacity, *shape))
+            for name, (shape, dtype) in self.columns.items()
+        }
+
+    def put(self, records: dict[str, np.ndarray]) -> int:
+        """
+        A function that writes as many of the records as fit in the ring 
+        and returns the number of records written.
+        """
+
+        written = self.written.value
+        n = min(len(next(iter(records.values()))), self.capacity - (written - self.read.value))
+        if n > 0:
+            slots = (written + np.arange(n)) % self.capacity
+            for name, array in self.arrays.items():
+                array[slots] = records[name][:n]
+
+            # Publish the records only after they are written
+            with self.written.get_lock():
+                self.written.value = written + n
+
+        return n
+
+    def get(self) -> dict[str, np.ndarray] | None:
+        """
+        A function that returns copies of all records that are written but 
+        not read yet, or None if there are none.
+        """
+
+        read = self.read.value
+        n = self.written.value - read
+        if n == 0:
+            return None
+
+        slots = (read + np.arange(n)) % self.capacity
+        records = {name: array[slots] for name, array in self.arrays.items()}
+
+        # Free the slots only after the records are copied
+        with self.read.get_lock():
+            self.read.value = read + n
+
+        return records
+
+
+def transition_columns(state_shape: tuple[int, ...], state_dtype: type
+                       ) -> dict[str, tuple[tuple[int, ...], type]]:
+    """A function that returns the columns of the records of transitions."""
+
+    return {"states": (state_shape, state_dtype), "actions": ((), np.int64),
+            "rewards": ((), np.float64), "new_states": (state_shape, state_dtype),
+            "terminated": ((), bool)}
+
+
+# The columns of the records of finished episodes
+episode_columns = {"total_rewards": ((), np.float64), "score": ((), np.int64),
+                   "steps": ((), np.int64), "epsilon": ((), np.float64)}
+
+
+def _put_all(ring: SharedRing, records: dict[str, np.ndarray], stop) -> None:
+    """An internal function that writes all records, waiting while the ring is full"""
+
+    n, total = 0, len(next(iter(records.values())))
+    while n < total and not stop.is_set():
+        n += ring.put({name: array[n:] for name, array in records.items()})
+        if n < total:
+            sleep(0.001)
+
+
+def _creditable_steps(env: gym.Env) -> int:
+    """
+    An internal function that returns the number of the latest steps whose 
+    transitions can still be credited, which are the steps since the oldest 
+    alive bullet of the player was shot.
+    """
+
+    bullets = env.unwrapped.player_bullets
+
+    return int(bullets.lifetime[bullets.slots].max(initial=0))
+
+
+def run_actor(make_env_fn, seed: int | None, epsilon: float, time_intvl: int,
+              activations: list[str], broadcast: WeightBroadcast,
+              transitions: SharedRing, episodes: SharedRing, stop,
+              sync_steps: int = 400, chunk_size: int = 32) -> None:
+    """
+    A function that plays episodes headless with an epsilon-greedy copy of
+    the learner's policy in an actor process. The rewards are smoothed and 
+    credited like in RLModel, and the transitions whose rewards are final 
+    are streamed to the learner in chunks of about chunk_size transitions. 
+    The result of every episode follows its last transitions.
+    """
+
+    env = make_env_fn(render_mode=None)
+    env.action_space.seed(seed)
+    rng = np.random.default_rng(seed)
+
+    version, weights = broadcast.fetch(0)
+    policy = NumpyPolicy(weights, activations)
+
+    # Keep the transitions of the current episode, as their rewards can 
+    # still be credited, and count the transitions already sent
+    memory = ReplayMemory(env.spec.max_episode_steps, env.observation_space.shape,
+                          env.observation_space.dtype)
+    processor = TransitionProcessor(memory, 1, time_intvl)
+
+    state, reset_info = env.reset(seed=seed)
+    while not stop.is_set():
+        total_rewards = 0
+        sent = 0
+
+        terminated, truncated = False, False
+        step = 0
+        while not (terminated or truncated) and not stop.is_set():
+            step += 1
+
+            # Use the latest weights of the learner regularly
+            if step % sync_steps == 1:
+                version, weights = broadcast.fetch(version)
+                if weights is not None:
+                    policy.set_weights(weights)
+
+            # Pick action either randomly or not
+            if rng.random() <= epsilon:
+                action = env.action_space.sample()
+            else:
+                action = policy.act(state)
+
+            # Take action and get reward
+            new_state, reward, terminated, truncated, info = env.step(action)
+
+            # Smooth and credit the reward, and store the transitions whose
+            # rewards are final in the memory of the episode
+            processor.step(state, action, reward, new_state, terminated,
+                           terminated or truncated, info["bullet lifetime"])
+
+            state = new_state
+            total_rewards += reward
+
+            # Send the transitions that can no longer be credited, or all
+            # transitions once the episode ends
+            final = len(memory) if terminated or truncated else \
+                min(len(memory), step - _creditable_steps(env))
+            if final - sent >= chunk_size or ((terminated or truncated) and final > sent):
+                states, actions, rewards, new_states, terminateds = \
+                    memory.batch(np.arange(sent, final))
+                _put_all(transitions, {"states": states, "actions": actions,
+                                       "rewards": rewards, "new_states": new_states,
+                                       "terminated": terminateds}, stop)
+                sent = final
+
+        if not (terminated or truncated):
+            break
+
+        # Send the result of the episode after its transitions
+        _put_all(episodes, {"total_rewards": np.array([total_rewards]),
+                            "score": np.array([info["score"]]),
+                            "steps": np.array([info["steps"]]),
+                            "epsilon": np.array([epsilon])}, stop)
+
+        memory.clear()
+        state, reset_info = env.reset()
+
+    env.close()
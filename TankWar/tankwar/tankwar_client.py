@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+import socket
+import struct
+
+import numpy as np
+
+# The binary protocol of the env server in tankwar_serve.py. Every request
+# and response starts with a header of an unsigned byte and the unsigned
+# 32-bit length of the payload that follows. All numbers are little-endian.
+#
+# Requests (the byte is the operation):
+#     OP_SPEC:  no payload
+#     OP_RESET: n (uint32), env_ids (uint32 * n), seeds (int64 * n, -1 for no seed)
+#     OP_STEP:  n (uint32), env_ids (uint32 * n), actions (uint8 * n)
+#
+# Responses (the byte is the status, and the payload of STATUS_ERROR is
+# a UTF-8 error message):
+#     OP_SPEC:  num_envs (uint32), n_actions (uint32), observation dtype
+#               (1 char, "f" for float32 or "B" for uint8), ndim (uint8),
+#               observation shape (uint32 * ndim)
+#     OP_RESET: observations (n * observation shape)
+#     OP_STEP:  observations (n * observation shape), rewards (float32 * n),
+#               terminated (uint8 * n), truncated (uint8 * n),
+#               final observations (k * observation shape)
+#
+# An env that terminates or is truncated in OP_STEP is reset, and the
+# observation of its new episode is returned together with the done flags.
+# The last observations of the k envs that are done follow in the order
+# of the envs, so that clients can bootstrap from truncated episodes.
+#
+# This module only needs the standard library and NumPy, so clients do not
+# need the game.
+
+OP_SPEC, OP_RESET, OP_STEP = 0, 1, 2
+STATUS_OK, STATUS_ERROR = 0, 1
+
+header = struct.Struct("<BI")
+count = struct.Struct("<I")
+
+dtype_codes = {np.dtype(np.float32): b"f", np.dtype(np.uint8): b"B"}
+
+
+def parse_address(address: str) -> tuple[int, str | tuple[str, int]]:
+    """
+    A function that maps an address to a socket family and a socket
+    address. "HOST:PORT" is a TCP address and anything else is the path of a
+    Unix domain socket.
+    """
+
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return socket.AF_INET, (host or "localhost", int(port))
+
+    return socket.AF_UNIX, address
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytes:
+    """A function that receives exactly size bytes from a socket"""
+
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise ConnectionError("The connection is closed")
+        received += n
+
+    return bytes(buffer)
+
+
+def send_message(sock: socket.socket, code: int, *payload: bytes) -> None:
+    """A function that sends a header and a payload in one call"""
+
+    length = sum(len(part) for part in payload)
+    sock.sendall(b"".join((header.pack(code, length), *payload)))
+
+
+def recv_message(sock: socket.socket) -> tuple[int, bytes]:
+    """A function that receives a header and its payload"""
+
+    code, length = header.unpack(recv_exact(sock, header.size))
+
+    return code, recv_exact(sock, length)
+
+
+def split_batch(payload: bytes, dtype: type) -> tuple[np.ndarray, np.ndarray]:
+    """A function that splits a batch payload into env ids and values"""
+
+    (n,) = count.unpack_from(payload)
+    env_ids = np.frombuffer(payload, dtype="<u4", count=n, offset=count.size)
+    values = np.frombuffer(payload, dtype=dtype, count=n, offset=count.size + 4 * n)
+
+    return env_ids, values
+
+
+class TankWarClient:
+    """
+    A client that steps the envs hosted by tankwar_serve.py in batches,
+    one round trip per batch.
+    """
+
+    def __init__(self, address: str) -> None:
+        family, sock_address = parse_address(address)
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.connect(sock_address)
+        if family == socket.AF_INET:
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        spec = self._request(OP_SPEC, b"")
+        self.num_envs, self.n_actions = struct.unpack_from("<II", spec)
+        self.observation_dtype = np.dtype(
+            np.float32 if spec[8:9] == b"f" else np.uint8).newbyteorder("<")
+        (ndim,) = struct.unpack_from("<B", spec, 9)
+        self.observation_shape = struct.unpack_from(f"<{ndim}I", spec, 10)
+
+    def _request(self, op: int, payload: bytes) -> bytes:
+        """An internal function that sends a request and returns the response payload"""
+
+        send_message(self.sock, op, payload)
+        status, response = recv_message(self.sock)
+        if status == STATUS_ERROR:
+            raise RuntimeError(response.decode())
+
+        return response
+
+    @staticmethod
+    def _pack_batch(env_ids, values, dtype: str) -> bytes:
+        """An internal function that packs env ids and values into a batch payload"""
+
+        env_ids = np.asarray(env_ids, dtype="<u4")
+        values = np.asarray(values, dtype=dtype)
+        assert env_ids.shape == values.shape and env_ids.ndim == 1
+
+        return count.pack(len(env_ids)) + env_ids.tobytes() + values.tobytes()
+
+    def _observations(self, payload: bytes, n: int, offset: int = 0) -> np.ndarray:
+        """An internal function that unpacks n observations"""
+
+        return np.frombuffer(payload, dtype=self.observation_dtype,
+                             count=n * int(np.prod(self.observation_shape)),
+                             offset=offset).reshape((n, *self.observation_shape))
+
+    def reset_batch(self, env_ids, seeds=None) -> np.ndarray:
+        """
+        A function that resets the envs with the seeds (None or -1 for no
+        seed) and returns their observations.
+        """
+
+        if seeds is None:
+            seeds = np.full(len(env_ids), -1)
+
+        payload = self._request(OP_RESET, self._pack_batch(env_ids, seeds, "<i8"))
+
+        return self._observations(payload, len(env_ids))
+
+    def step_batch(self, env_ids, actions
+                   ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        A function that steps the envs with the actions and returns their
+        observations, rewards, terminated and truncated flags, and final
+        observations. The envs that are done are reset, so their
+        observations start new episodes, while their final observations
+        are the last observations of the episodes that ended. The final
+        observations of the other envs are their observations.
+        """
+
+        n = len(env_ids)
+        payload = self._request(OP_STEP, self._pack_batch(env_ids, actions, np.uint8))
+
+        offset = n * int(np.prod(self.observation_shape)) * self.observation_dtype.itemsize
+        observations = self._observations(payload, n)
+        rewards = np.frombuffer(payload, dtype="<f4", count=n, offset=offset)
+        terminated = np.frombuffer(payload, dtype=np.uint8, count=n, offset=offset + 4 * n)
+        truncated = np.frombuffer(payload, dtype=np.uint8, count=n, offset=offset + 5 * n)
+
+        done = (terminated | truncated).astype(bool)
+        final_observations = observations.copy()
+        final_observations[done] = self._observations(payload, int(done.sum()),
+                                                      offset + 6 * n)
+
+        return (observations, rewards, terminated.astype(bool), truncated.astype(bool),
+                final_observations)
+
+    def close(self) -> None:
+        self.sock.close()
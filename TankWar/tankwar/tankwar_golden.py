@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+import hashlib
+import os
+import pickle
+import sys
+from itertools import product
+
+import gym
+import gym_tankwar
+import numpy as np
+
+from cmdargs import args
+
+# The settings covered by the golden traces
+difficulties = (0, 1)
+full_enemies = (False, True)
+fpss = (15, 30, 60)
+
+# The action scripts and the seeds played with each of them
+scripts = (("random", 0), ("random", 1), ("shoot", 2), ("still", 3))
+
+# The number of steps recorded for each case
+case_steps = 300
+
+
+def _script_actions(script: str, seed: int) -> np.ndarray:
+    """An internal function that maps a script to a fixed sequence of actions"""
+
+    if script == "random":  # Random actions generated from the seed
+        return np.random.default_rng(seed).integers(0, 10, size=case_steps)
+    elif script == "shoot":  # Shoot while moving in all directions in turn
+        return np.tile(np.repeat(np.arange(5, 10), 10), case_steps // 50 + 1)[:case_steps]
+    else:  # Stand still
+        return np.full(case_steps, 4)
+
+
+def _step_hash(observation: np.ndarray, reward: float, score: int, hp: int) -> int:
+    """An internal function that hashes the result of a step into 32 bits"""
+
+    digest = hashlib.blake2b(observation.tobytes(), digest_size=4)
+    digest.update(np.array([reward], dtype=np.float64).tobytes())
+    digest.update(np.array([score, hp], dtype=np.int64).tobytes())
+
+    return int.from_bytes(digest.digest(), "little")
+
+
+def _run_case(difficulty: int, full_enemy: bool, fps: int,
+              script: str, seed: int, round_trip: bool = False) -> np.ndarray:
+    """
+    An internal function that plays a case and returns the hashes of
+    the reset and all steps. If round_trip is True, the env is pickled and
+    unpickled twice in a row halfway through the case.
+    """
+
+    env = gym.make(
+        "gym_tankwar/TankWar-v0",
+        render_mode=None,
+        starting_hp=args.starting_hp,
+        difficulty=difficulty,
+        full_enemy=full_enemy,
+        episodes=case_steps,
+        sim_hz=fps,
+    )
+
+    # Use the episode number to generate a sequence of seeds from the seed
+    episode = 0
+    observation, reset_info = env.reset(seed=seed * case_steps + episode)
+    hashes = [_step_hash(observation, 0, env.unwrapped.score, env.unwrapped.hp)]
+    for step, action in enumerate(_script_actions(script, seed)):
+        if round_trip and step == case_steps // 2:
+            # The second round trip pickles an env whose sprites are not
+            # rebuilt yet, like an env moved between workers more than once
+            for _ in range(2):
+                unpickled_env = pickle.loads(pickle.dumps(env))
+                env.close()
+                env = unpickled_env
+
+        observation, reward, terminated, truncated, info = env.step(int(action))
+        hashes.append(_step_hash(observation, reward, info["score"], env.unwrapped.hp))
+
+        if terminated:
+            episode += 1
+            observation, reset_info = env.reset(seed=seed * case_steps + episode)
+
+    env.close()
+
+    return np.array(hashes, dtype=np.uint32)
+
+
+def _cases() -> list[tuple[int, bool, int, str, int]]:
+    """An internal function that returns the settings, script and seed of all cases"""
+
+    return [
+        (difficulty, full_enemy, fps, script, seed)
+        for difficulty, full_enemy, fps, (script, seed)
+        in product(difficulties, full_enemies, fpss, scripts)
+    ]
+
+
+def _case_name(difficulty: int, full_enemy: bool, fps: int, script: str, seed: int) -> str:
+    """An internal function that returns the name of a case"""
+
+    return f"d_{difficulty}_fe_{int(full_enemy)}_fps_{fps}_{script}_s_{seed}"
+
+
+def main():
+    path = f"golden/{args.golden_file}.npz"
+
+    if args.record:
+        # Make a directory to store golden traces if necessary
+        if not os.path.isdir("golden"):
+            os.mkdir("golden")
+
+        traces = {}
+        for case in _cases():
+            traces[_case_name(*case)] = _run_case(*case)
+            print(f"Recorded {_case_name(*case)}")
+
+        np.savez_compressed(path, **traces)
+        print(f"Golden traces saved to {path}")
+        return
+
+    assert os.path.isfile(path), f"{path} does not exist, record it with -rec first"
+
+    golden = np.load(path)
+    diverged_cases = 0
+    for case in _cases():
+        name = _case_name(*case)
+        if name not in golden:
+            print(f"{name:<30} missing from {path}")
+            diverged_cases += 1
+            continue
+
+        expected, hashes = golden[name], _run_case(*case, args.round_trip)
+        diverged = np.flatnonzero(expected[:len(hashes)] != hashes[:len(expected)])
+        if diverged.size > 0:
+            print(f"{name:<30} diverged at step {diverged[0]}")
+            diverged_cases += 1
+        elif len(expected) != len(hashes):
+            print(f"{name:<30} diverged at step {min(len(expected), len(hashes))}")
+            diverged_cases += 1
+        else:
+            print(f"{name:<30} identical")
+
+    print(f"{diverged_cases} of {len(golden.files)} cases diverged")
+
+    sys.exit(1 if diverged_cases else 0)
+
+
+if __name__ == "__main__":
+    main()
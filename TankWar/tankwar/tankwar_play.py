@@ -5,7 +5,8 @@ import gym_tankwar
 import pygame
 import random
 
-from cmdargs import args
+from cmdargs import args, max_episode_steps
+from numpy_policy import NumpyPolicy, model_path
 
 
 def _pressed_to_action(pressed_keys, last_pressed_keys, last_action) -> int | None:
@@ -57,6 +58,7 @@ def _pressed_to_action(pressed_keys, last_pressed_keys, last_action) -> int | No
 def main():
     assert args.episodes > 0, "EPISODES must be a positive integer"
     assert args.max_steps > 0, "MAX_STEPS must be a positive integer"
+    assert args.mode != "human" or args.file is None, "FILE cannot be used in human mode"
 
     render_mode = args.mode
     if render_mode == "human_rand":
@@ -70,6 +72,8 @@ def main():
         full_enemy=args.full_enemy,
         episodes=args.episodes,
         extra_scene=True if args.mode == "human" else False,
+        sim_hz=args.fps,
+        render_fps=args.render_fps,
     )
 
     # The extra +1 is for the last game-over scene in human mode
@@ -77,14 +81,14 @@ def main():
 
 
     if args.mode != "human":
-        env = gym.wrappers.TimeLimit(env, max_episode_steps=args.max_steps)
-
-    if args.fps is not None:
-        env.metadata["render_fps"] = args.fps
+        env = gym.wrappers.TimeLimit(env, max_episode_steps=max_episode_steps)
 
     env.action_space.seed(args.seed)
     random.seed(args.seed)
 
+    # Let a trained model play instead of random actions if FILE is specified
+    policy = NumpyPolicy.load(model_path(args.file)) if args.file is not None else None
+
     # Use random.randint to generate a sequence of seeds from args.seed
     # to match the same implementation in tankwar_test.py
     observation, reset_info = env.reset(seed=random.randint(0, 2 ** 32 - 1))
@@ -153,15 +157,19 @@ def main():
             if pressed_keys[pygame.K_q] or pressed_keys[pygame.K_ESCAPE]:
                 running = False
 
-            # Pick an action from the action space randomly
-            action = env.action_space.sample()
-
-            # Check if the game is over
+            # Check if the game is over, and start a new episode before 
+            # picking its first action
             if gameover:
                 gameover = False
                 # observation, reset_info = env.reset(seed=args.seed)
                 observation, reset_info = env.reset(seed=random.randint(0, 2 ** 32 - 1))
 
+            # Pick an action with the model, or from the action space randomly
+            if policy is not None:
+                action = policy.act(observation)
+            else:
+                action = env.action_space.sample()
+
         if action is not None:
             # Take action and get reward
             observation, reward, terminated, truncated, info = env.step(action)
@@ -174,7 +182,7 @@ def main():
                 if terminated:
                     print(
                         f"Episode {episode:<{len(str(args.episodes))}d} "
-                        f"completed in {step:<{len(str(args.max_steps))}d} "
+                        f"completed in {step:<{len(str(max_episode_steps))}d} "
                         f"steps with reward = {rewards:<9.2f}, "
                         f"score = {info['score']}"
                     )
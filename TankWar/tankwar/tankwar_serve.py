@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+import os
+import random
+import socket
+import socketserver
+import struct
+import threading
+
+import gym
+import gym_tankwar
+import numpy as np
+
+from cmdargs import args, max_episode_steps
+from tankwar_client import (OP_RESET, OP_SPEC, OP_STEP, STATUS_ERROR, STATUS_OK,
+                            dtype_codes, parse_address, recv_message, send_message,
+                            split_batch)
+
+# The binary protocol of the server and its client is described in tankwar_client.py
+
+
+class _EnvHost:
+    """A class that owns the envs of the server and serves the operations."""
+
+    def __init__(self, num_envs: int) -> None:
+        self.envs = []
+        for _ in range(num_envs):
+            env = gym.make(
+                "gym_tankwar/TankWar-v0",
+                render_mode=None,
+                starting_hp=args.starting_hp,
+                difficulty=args.difficulty,
+                episodes=args.episodes,
+                full_enemy=args.full_enemy,
+                sim_hz=args.fps,
+            )
+            env = gym.wrappers.TimeLimit(env, max_episode_steps=max_episode_steps)
+            self.envs.append(env)
+
+        # The envs are shared by all clients, so only one operation runs at a time
+        self.lock = threading.Lock()
+
+        observation_space = self.envs[0].observation_space
+        self.dtype = observation_space.dtype
+        self.spec = b"".join((
+            struct.pack("<II", num_envs, self.envs[0].action_space.n),
+            dtype_codes[observation_space.dtype],
+            struct.pack(f"<B{len(observation_space.shape)}I",
+                        len(observation_space.shape), *observation_space.shape),
+        ))
+
+        # Use random.randint to generate a sequence of seeds from args.seed
+        for env in self.envs:
+            env.reset(seed=random.randint(0, 2 ** 32 - 1))
+
+    def _check_ids(self, env_ids: np.ndarray) -> None:
+        """An internal function that checks whether the env ids exist"""
+
+        if env_ids.size and env_ids.max() >= len(self.envs):
+            raise ValueError(f"Env ids must be less than {len(self.envs)}")
+
+    def reset(self, payload: bytes) -> list[bytes]:
+        env_ids, seeds = split_batch(payload, "<i8")
+        self._check_ids(env_ids)
+
+        observations = [
+            self.envs[env_id].reset(seed=None if seed < 0 else int(seed))[0]
+            for env_id, seed in zip(env_ids.tolist(), seeds.tolist())
+        ]
+
+        return [np.array(observations, dtype=self.dtype).tobytes()]
+
+    def step(self, payload: bytes) -> list[bytes]:
+        env_ids, actions = split_batch(payload, np.uint8)
+        self._check_ids(env_ids)
+
+        n = len(env_ids)
+        observations = []
+        final_observations = []
+        rewards = np.zeros(n, dtype="<f4")
+        terminated = np.zeros(n, dtype=np.uint8)
+        truncated = np.zeros(n, dtype=np.uint8)
+        for i, (env_id, action) in enumerate(zip(env_ids.tolist(), actions.tolist())):
+            env = self.envs[env_id]
+            observation, rewards[i], terminated[i], truncated[i], info = env.step(action)
+            if terminated[i] or truncated[i]:
+                # Keep the last observation of the episode for the client
+                final_observations.append(observation)
+                observation, reset_info = env.reset()
+            observations.append(observation)
+
+        final_observations = np.array(final_observations, dtype=self.dtype)
+
+        return [np.array(observations, dtype=self.dtype).tobytes(),
+                rewards.tobytes(), terminated.tobytes(), truncated.tobytes(),
+                final_observations.tobytes()]
+
+    def close(self) -> None:
+        for env in self.envs:
+            env.close()
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """A class that serves the requests of one client until it disconnects."""
+
+    def handle(self) -> None:
+        if self.request.family == socket.AF_INET:
+            # Disable Nagle's algorithm as every message is a complete batch
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        host = self.server.host
+        while True:
+            try:
+                op, payload = recv_message(self.request)
+            except ConnectionError:
+                return
+
+            try:
+                with host.lock:
+                    if op == OP_SPEC:
+                        response = [host.spec]
+                    elif op == OP_RESET:
+                        response = host.reset(payload)
+                    elif op == OP_STEP:
+                        response = host.step(payload)
+                    else:
+                        raise ValueError(f"Unknown operation {op}")
+            except Exception as e:
+                send_message(self.request, STATUS_ERROR, str(e).encode())
+            else:
+                send_message(self.request, STATUS_OK, *response)
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def main():
+    assert args.num_envs > 0, "NUM_ENVS must be a positive integer"
+    assert args.max_steps > 0, "MAX_STEPS must be a positive integer"
+
+    random.seed(args.seed)
+
+    host = _EnvHost(args.num_envs)
+
+    family, address = parse_address(args.address)
+    if family == socket.AF_INET:
+        server = _TCPServer(address, _RequestHandler)
+    else:
+        server = socketserver.ThreadingUnixStreamServer(address, _RequestHandler)
+        server.daemon_threads = True
+    server.host = host
+
+    print(f"Serving {args.num_envs} envs at {args.address} ...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        host.close()
+
+        # Remove the Unix domain socket file
+        if family == socket.AF_UNIX:
+            os.unlink(address)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+import os
+import random
+import resource
+import sys
+import tracemalloc
+from time import gmtime, strftime, time
+
+import gym
+import gym_tankwar
+import numpy as np
+
+from cmdargs import args, max_episode_steps
+
+# The subsystems that allocations are attributed to, matched by file path
+subsystems = (
+    ("env", os.path.join("gym_tankwar", "")),
+    ("trainer", "tankwar_train"),
+    ("tensorflow", "tensorflow"),
+    ("keras", "keras"),
+    ("pygame", "pygame"),
+    ("gym", os.path.join("gym", "")),
+    ("numpy", "numpy"),
+)
+
+# The number of steps that the growth is measured over
+growth_steps = 100_000
+
+
+def _rss_mb() -> float:
+    """An internal function that returns the resident set size in MB"""
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        # Fall back to the peak resident set size, which is in bytes on macOS
+        # and in KB elsewhere
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss / 2 ** 20 if sys.platform == "darwin" else maxrss / 2 ** 10
+
+
+def _subsystem(filename: str) -> str:
+    """An internal function that maps a source file to a subsystem"""
+
+    for name, pattern in subsystems:
+        if pattern in filename:
+            return name
+
+    return "other"
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    """
+    An internal function that takes a tracemalloc snapshot without the
+    allocations of tracemalloc itself and the import system.
+    """
+
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+
+
+class _SoakFinished(Exception):
+    """An exception that stops the soak test when the step budget is used up."""
+
+
+class _SoakSampler(gym.Wrapper):
+    """
+    A wrapper that samples the memory usage of the process and the sizes of
+    the env's sprite groups and stores every sample_interval steps.
+    """
+
+    def __init__(self, env: gym.Env, soak_steps: int, sample_interval: int) -> None:
+        super().__init__(env)
+
+        self.soak_steps = soak_steps
+        self.sample_interval = sample_interval
+
+        self.total_steps = 0
+        self.samples_steps, self.rss, self.traced = [], [], []
+        self.max_sizes = {}
+
+        # The tracemalloc snapshot that growth by subsystem is compared to
+        self.baseline = None
+
+        self.start_time = time()
+
+    def step(self, action):
+        result = self.env.step(action)
+
+        self.total_steps += 1
+        if self.total_steps % self.sample_interval == 0:
+            self._sample()
+
+        if self.total_steps >= self.soak_steps:
+            raise _SoakFinished
+
+        return result
+
+    def _sample(self) -> None:
+        """An internal function that records and prints a sample"""
+
+        self.samples_steps.append(self.total_steps)
+        self.rss.append(_rss_mb())
+        self.traced.append(tracemalloc.get_traced_memory()[0] / 2 ** 20)
+
+        # Take the first sample as the baseline to skip warming up
+        if self.baseline is None:
+            self.baseline = _snapshot()
+
+        unwrapped = self.env.unwrapped
+        sizes = {
+            "enemies": len(unwrapped.enemies),
+            "player_bullets": len(unwrapped.player_bullets),
+            "enemy_bullets": len(unwrapped.enemy_bullets),
+            "explosions": len(unwrapped.explosions),
+            "hearts": len(unwrapped.hearts),
+        }
+        for name, size in sizes.items():
+            self.max_sizes[name] = max(self.max_sizes.get(name, 0), size)
+
+        print(f"Steps: {self.total_steps:>{len(str(self.soak_steps))}d}, "
+              f"time elapsed: {strftime('%H:%M:%S', gmtime(time() - self.start_time))}, "
+              f"RSS: {self.rss[-1]:.1f} MB, traced: {self.traced[-1]:.1f} MB, "
+              f"sizes: {sizes}")
+
+    def growth(self, values: list[float]) -> float:
+        """
+        A function that returns the growth of sampled values in MB per
+        growth_steps steps, fitted over all samples after the first one.
+        """
+
+        if len(values) < 3:
+            return 0.0
+
+        slope, _ = np.polyfit(self.samples_steps[1:], values[1:], 1)
+
+        return slope * growth_steps
+
+    def top_allocators(self, n: int = 10) -> None:
+        """
+        A function that prints the allocators that grow most since the
+        baseline, summed by subsystem and listed by line.
+        """
+
+        if self.baseline is None:
+            return
+
+        stats = _snapshot().compare_to(self.baseline, "lineno")
+
+        growth_by_subsystem = {}
+        for stat in stats:
+            subsystem = _subsystem(stat.traceback[0].filename)
+            growth_by_subsystem[subsystem] = growth_by_subsystem.get(subsystem, 0) + stat.size_diff
+
+        print("Growth by subsystem since the first sample:")
+        for subsystem, size_diff in sorted(growth_by_subsystem.items(), key=lambda item: -item[1]):
+            print(f"  {subsystem:<12}{size_diff / 2 ** 20:>+10.3f} MB")
+
+        print(f"Top {n} allocators by growth since the first sample:")
+        for stat in stats[:n]:
+            print(f"  [{_subsystem(stat.traceback[0].filename)}] {stat}")
+
+
+def main():
+    assert args.mode != "human_rand", "human_rand mode cannot be used here"
+    assert args.soak_steps > 0, "SOAK_STEPS must be a positive integer"
+    assert args.sample_interval > 0, "SAMPLE_INTERVAL must be a positive integer"
+    assert args.max_steps > 0, "MAX_STEPS must be a positive integer"
+
+    tracemalloc.start()
+
+    env = gym.make(
+        "gym_tankwar/TankWar-v0",
+        render_mode=args.mode,
+        starting_hp=args.starting_hp,
+        difficulty=args.difficulty,
+        episodes=args.train_episodes if args.soak_trainer else args.soak_steps,
+        full_enemy=args.full_enemy,
+        sim_hz=args.fps,
+        render_fps=args.render_fps,
+    )
+    env = gym.wrappers.TimeLimit(env, max_episode_steps=max_episode_steps)
+    sampler = _SoakSampler(env, args.soak_steps, args.sample_interval)
+
+    env.action_space.seed(args.seed)
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+
+    try:
+        if args.soak_trainer:
+            # Import the trainer only when needed as it loads TensorFlow
+            from tankwar_train import RLModel
+
+            model = RLModel(
+                sampler,
+                sampler.observation_space.shape,
+                sampler.action_space.n,
+                args.mode,
+                args.difficulty,
+                args.train_episodes,
+                args.fast,
+                args.fps,
+                args.seed,
+            )
+            model.run()
+        else:
+            sampler.reset(seed=random.randint(0, 2 ** 32 - 1))
+            while True:
+                observation, reward, terminated, truncated, info = sampler.step(sampler.action_space.sample())
+                if terminated or truncated:
+                    sampler.reset(seed=random.randint(0, 2 ** 32 - 1))
+    except _SoakFinished:
+        pass
+
+    sampler.close()
+
+    rss_growth = sampler.growth(sampler.rss)
+    traced_growth = sampler.growth(sampler.traced)
+
+    print("=" * 80)
+    print(f"Max. sizes: {sampler.max_sizes}")
+    print(f"RSS growth: {rss_growth:+.3f} MB, traced growth: {traced_growth:+.3f} MB "
+          f"per {growth_steps} steps (threshold: {args.max_growth} MB)")
+    sampler.top_allocators()
+
+    if max(rss_growth, traced_growth) > args.max_growth:
+        print("Memory growth exceeds the threshold")
+        sys.exit(1)
+
+    print("Memory growth is within the threshold")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import socket
+
+import gym
+import gym_tankwar
+import pygame
+
+from cmdargs import args
+
+
+def _parse_address(address: str) -> tuple[str, int]:
+    """An internal function that splits HOST:PORT into a UDP address"""
+
+    host, _, port = address.rpartition(":")
+
+    return host or "localhost", int(port)
+
+
+class SpectatorPublisher(gym.Wrapper):
+    """
+    A wrapper that sends a snapshot of the game to a spectator every
+    spectate_every steps. Snapshots are sent as UDP datagrams, so the
+    wrapped env never waits for the spectator, and snapshots are dropped
+    if no spectator is listening.
+    """
+
+    def __init__(self, env: gym.Env, address: str, spectate_every: int) -> None:
+        super().__init__(env)
+
+        self.address = _parse_address(address)
+        self.spectate_every = spectate_every
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.total_steps = 0
+
+    def reset(self, **kwargs):
+        result = self.env.reset(**kwargs)
+        self._publish()
+
+        return result
+
+    def step(self, action):
+        result = self.env.step(action)
+
+        self.total_steps += 1
+        if self.total_steps % self.spectate_every == 0:
+            self._publish()
+
+        return result
+
+    def _publish(self) -> None:
+        """An internal function that sends a snapshot to the spectator"""
+
+        try:
+            self.sock.sendto(self.env.unwrapped.snapshot(), self.address)
+        except OSError:  # No spectator is listening
+            pass
+
+    def close(self) -> None:
+        self.sock.close()
+        super().close()
+
+
+def main():
+    env = gym.make(
+        "gym_tankwar/TankWar-v0",
+        render_mode="human",
+        starting_hp=args.starting_hp,
+        difficulty=args.difficulty,
+        episodes=args.episodes,
+        full_enemy=args.full_enemy,
+        sim_hz=args.fps,
+        render_fps=args.render_fps,
+    ).unwrapped
+
+    # Create the sprites and the window before any snapshot arrives
+    env.reset(seed=args.seed)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(_parse_address(args.spectator_address))
+    sock.setblocking(False)
+
+    print(f"Spectating at {args.spectator_address} ...")
+    running = True
+    while running:
+        # Detect events and pressed keys for quitting the game
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+        pressed_keys = pygame.key.get_pressed()
+        if pressed_keys[pygame.K_q] or pressed_keys[pygame.K_ESCAPE]:
+            running = False
+
+        # Skip to the latest snapshot so that the spectator never lags behind
+        snapshot = None
+        while True:
+            try:
+                snapshot, _ = sock.recvfrom(2 ** 16)
+            except BlockingIOError:
+                break
+
+        # Draw the latest snapshot, or wait for one at the framerate
+        if snapshot is not None:
+            env.load_snapshot(snapshot)
+        else:
+            env.clock.tick(env.render_fps)
+
+    sock.close()
+    env.close()
+
+
+if __name__ == "__main__":
+    main()
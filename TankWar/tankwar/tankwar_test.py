@@ -1,20 +1,13 @@
 #!/usr/bin/env python3
 
-# Code source: https://stackoverflow.com/questions/35911252/disable-tensorflow-debugging-information
-import os
-os.environ["TF_CPP_MIN_LOG_LEVEL"] = "1"  # Reduce the number of logging messages
-
-os.environ['CUDA_VISIBLE_DEVICES'] = "0"  # Use GPU acceleration if possible
-
 import random
 
 import gym
 import gym_tankwar
-import numpy as np
 import pygame
-from tensorflow import keras
 
-from cmdargs import args
+from cmdargs import args, max_episode_steps
+from numpy_policy import NumpyPolicy, model_path
 
 
 def main():
@@ -30,13 +23,15 @@ def main():
         difficulty=args.difficulty,
         episodes=args.test_episodes,
         full_enemy=args.full_enemy,
+        sim_hz=args.fps,
+        render_fps=args.render_fps,
     )
 
     env.action_space.seed(args.seed)
     random.seed(args.seed)
 
-    # Load the model
-    model = keras.models.load_model(f"models/{args.file}.h5", compile=False)
+    # Load the model with NumPy instead of TensorFlow
+    policy = NumpyPolicy.load(model_path(args.file))
 
     print("Testing started ...")
     episode = success_episodes = 0
@@ -51,7 +46,7 @@ def main():
         # so that the testing scenarios will be identical for the same args.seed
         state, reset_info = env.reset(seed=random.randint(0, 2 ** 32 - 1))
 
-        for step in range(1, args.max_steps + 1):
+        for step in range(1, max_episode_steps + 1):
             if not running:
                 break
 
@@ -66,8 +61,7 @@ def main():
                     running = False
 
             # Get action from the model
-            predicted = model.predict(state.reshape(1, state.shape[0]), verbose=0)
-            action = np.argmax(predicted)
+            action = policy.act(state)
 
             # Take action and get reward
             state, reward, terminated, truncated, info = env.step(action)
@@ -79,7 +73,7 @@ def main():
                 total_score += info["score"]
                 total_step += step
                 print(f"Episode {episode:<{len(str(args.test_episodes))}d} "
-                      f"completed in {step:<{len(str(args.max_steps))}d} "
+                      f"completed in {step:<{len(str(max_episode_steps))}d} "
                       f"steps with score = {info['score']}")
                 break
 
@@ -10,11 +10,11 @@ os.environ["TF_CPP_MIN_LOG_LEVEL"] = "1"  # Reduce the number of logging message
 os.environ['CUDA_VISIBLE_DEVICES'] = "0"  # Use GPU acceleration if possible
 
 import gc
+import multiprocessing as mp
 import random
-from collections import deque
 from datetime import datetime
-from itertools import islice
-from time import gmtime, strftime, time
+from functools import partial
+from time import gmtime, sleep, strftime, time
 
 import gym
 import gym_tankwar
@@ -24,16 +24,22 @@ import pygame
 import tensorflow as tf
 from tensorflow import keras
 
-from cmdargs import args
-
-# Print the number of GPUs available
-print("Number of GPUs available: ", len(tf.config.list_physical_devices('GPU')))
+from checkpoint import Checkpointer
+from cmdargs import args, max_episode_steps
+from numpy_policy import NumpyPolicy
+from replay_memory import PrioritizedReplayMemory, ReplayMemory
+from tankwar_actor import (SharedRing, StackableInfo, WeightBroadcast, episode_columns, make_env,
+                           run_actor, transition_columns)
+from transition_processor import TransitionProcessor
 
 
 class RLModel:
     def __init__(self, env: gym.Env, state_shape: int, action_shape: int,
                  mode: str, difficulty: int, train_episodes: int, fast: bool,
-                 render_fps: int, seed: int | None = None) -> None:
+                 render_fps: int, seed: int | None = None,
+                 prioritized: bool = False, actors: int = 0,
+                 make_env_fn=None, keep_checkpoints: int = 0,
+                 snapshot_every: int = 0, eager_train: bool = False) -> None:
         self.env = env
         self.state_shape = state_shape
         self.action_shape = action_shape
@@ -43,6 +49,15 @@ class RLModel:
         self.fast = fast
         self.render_fps = render_fps
         self.seed = seed
+        self.prioritized = prioritized
+
+        # Whether to train with model.predict and model.fit instead of the
+        # compiled training step
+        self.eager_train = eager_train
+
+        # The number of actor processes and the function that makes their envs
+        self.actors = actors
+        self.make_env_fn = make_env_fn
 
         # Initialize variables that determine the behaviour of 
         # the searching of the action space
@@ -51,12 +66,38 @@ class RLModel:
         self.min_epsilon = 0.01
         self.decay = 0.03
 
+        # Initialize variables that determine how much the importance-sampling
+        # weights correct the bias of prioritized replay, which increases
+        # to full correction at the same rate as epsilon decays
+        self.beta = 0.4
+        self.max_beta = 1
+        self.min_beta = 0.4
+
         self.time_intvl_factor = 1
 
+        # The rate at which the Q-values of the taken actions move towards
+        # their targets, and the discount of future rewards
+        self.q_learning_rate = 0.7
+        self.discount_factor = 0.618
+
         self.train_target_steps = 15
         self.update_target_stesp = 400
+
+        # The number of training updates between two publications of the
+        # weights to the actor processes
+        self.publish_weights_steps = 10
+
+        # The number of transitions that each actor process can stream ahead
+        # of the learner, and 1/64 of it for the results of its episodes
+        self.actor_ring_size = 4096
+
         self.save_model_steps = 25 if not self.fast else 5
 
+        # The number of checkpoints to keep (0 to keep all), and the number
+        # of episodes between two weights-only snapshots (0 for none)
+        self.keep_checkpoints = keep_checkpoints
+        self.snapshot_every = snapshot_every
+
         # Maximum time elapsed (in minute) in fast mode
         self.fast_minute = 20
 
@@ -75,14 +116,29 @@ class RLModel:
         # Copy main model's weights to target model
         self.target_model.set_weights(self.main_model.get_weights())
 
+        # Pick greedy actions with a NumPy forward pass over the main 
+        # model's weights instead of model.predict
+        self.policy = NumpyPolicy.from_keras(self.main_model)
+
+        # The compiled training update, which is created in the first training
+        self.train_step = None
+
+        # Write checkpoints in a background thread with a copy of the target
+        # model, so that training does not wait for the files
+        self.checkpointer = Checkpointer(self.policy.activations,
+                                         keras.models.clone_model(self.target_model),
+                                         self.keep_checkpoints)
+
         # Print the summary of the target model
         print(self.target_model.summary())
         print("=" * 65)
 
-        # Initialize a fixed-sized list to store states, actions and rewards
-        self.replay_memory = deque(maxlen=20_000)
+        # Initialize a fixed-sized memory to store states, actions and rewards
+        memory_class = PrioritizedReplayMemory if self.prioritized else ReplayMemory
+        self.replay_memory = memory_class(20_000, self.state_shape,
+                                          self.env.observation_space.dtype, self.seed)
 
-        steps_to_update_target_model = 0
+        self.steps_to_update_target_model = 0
 
         time_intvl = int(self.time_intvl_factor * self.render_fps)
 
@@ -90,6 +146,25 @@ class RLModel:
         self.start_time = time()
 
         self.episode = 0
+        if self.actors > 0:
+            self._run_distributed(time_intvl)
+        elif isinstance(self.env, gym.vector.VectorEnv):
+            self._run_vector(time_intvl)
+        else:
+            self._run_single(time_intvl)
+
+        # Wait for the last checkpoints to be written
+        self.checkpointer.close()
+
+        self.env.close()
+
+        print(f"Avg score: {self._average(self.scores):.2f}, Avg steps: {self._average(self.steps):.2f}")
+
+    def _run_single(self, time_intvl: int) -> None:
+        """An internal function that trains the models with a single env"""
+
+        processor = TransitionProcessor(self.replay_memory, 1, time_intvl)
+
         running = True
         while (self.episode < self.train_episodes or self.fast) and running:
             # Count current episode
@@ -101,9 +176,6 @@ class RLModel:
             state, reset_info = self.env.reset()
 
             terminated, truncated = False, False
-            reward_interval = deque(maxlen=time_intvl)
-            reward_interval_shoot = deque(maxlen=time_intvl)
-            step = 0
             while not (terminated or truncated):
                 if not running:
                     break
@@ -118,83 +190,239 @@ class RLModel:
                     if pressed_keys[pygame.K_q] or pressed_keys[pygame.K_ESCAPE]:
                         running = False
 
-                steps_to_update_target_model += 1
-                step += 1
+                self.steps_to_update_target_model += 1
 
                 # Pick action either randomly or not
                 random_num = np.random.rand()
                 if random_num <= self.epsilon:
                     action = self.env.action_space.sample()
                 else:
-                    state_reshaped = state.reshape((1, state.shape[0]))
-                    predicted = self.main_model.predict(state_reshaped, verbose=0)
-                    action = np.argmax(predicted)
+                    action = self.policy.act(state)
 
                 # Take action and get reward
                 new_state, reward, terminated, truncated, info = self.env.step(action)
 
-                reward_interval_shoot.append(0)
-                reward_interval.append(reward)
-                reward_mean = np.array(reward_interval).mean()
-                self.replay_memory.append([state, action, reward, new_state, terminated])
-                if info["bullet lifetime"] is not None:
-                    if info["bullet lifetime"] <= time_intvl:
-                        reward_interval_shoot[-info["bullet lifetime"]] += 500
-                    else:
-                        self.replay_memory[-info["bullet lifetime"]][2] += 500
-
-                if step > time_intvl:
-                    self.replay_memory[-time_intvl][2] = reward_mean + reward_interval_shoot[0]
-                if steps_to_update_target_model % self.train_target_steps == 0 or (terminated or truncated):
+                # Smooth and credit the reward, and store the transitions
+                # whose rewards are final in replay memory
+                processor.step(state, action, reward, new_state, terminated,
+                               terminated or truncated, info["bullet lifetime"])
+
+                if self.steps_to_update_target_model % self.train_target_steps == 0 or (terminated or truncated):
                     self._train(terminated)
 
                 state = new_state
                 total_training_rewards += reward
 
                 if terminated or truncated:
-                    for i in range(1, min(time_intvl, step) + 1):
-                        self.replay_memory[-i][2] = np.array(list(islice(reward_interval, i - 1, None))).mean() + \
-                                                    reward_interval_shoot[i - 1]
-
-                    self.rewards.append(total_training_rewards)
-                    self.epsilons.append(self.epsilon)
-                    self.scores.append(info['score'])
-                    self.steps.append(info['steps'])
-
-                    # Save the target model regularly
-                    if self.episode % self.save_model_steps == 0 or self.episode == self.train_episodes:
-                        self.save()
-
-                    # Print progress wrt time
-                    time_elapsed = self._timer(self.episode)
-
-                    # Print episode's training result
-                    print(f"Total training reward = {total_training_rewards:<9.2f} "
-                          f"at episode {self.episode:<{len(str(self.train_episodes))}d} "
-                          f"with score = {info['score']:<2d}, steps = {info['steps']}")
-
-                    # Copy main model's weights to target model
-                    if steps_to_update_target_model >= self.update_target_stesp:
-                        self.target_model.set_weights(self.main_model.get_weights())
-                        steps_to_update_target_model = 0
-
-                    if time_elapsed >= self.fast_minute * 60 and self.fast:
-                        self.save()
-                        running = False
+                    running = self._finish_episode(total_training_rewards, info)
+
+            self._next_episode()
+
+    def _run_vector(self, time_intvl: int) -> None:
+        """
+        An internal function that trains the models with all envs of a 
+        vector env, which reset themselves when their episodes end. The
+        actions of all envs are picked with one forward pass, and their
+        transitions are stored in replay memory at once.
+        """
+
+        num_envs = self.env.num_envs
+        indices = np.arange(num_envs)
+
+        processor = TransitionProcessor(self.replay_memory, num_envs, time_intvl)
+        total_training_rewards = [0] * num_envs
+
+        states, reset_infos = self.env.reset(seed=self.seed)
+
+        running = True
+        while (self.episode < self.train_episodes or self.fast) and running:
+            steps_before = self.steps_to_update_target_model
+            self.steps_to_update_target_model += num_envs
+
+            # Pick actions either randomly or not, with one forward pass
+            # for all greedy actions
+            actions = self.env.action_space.sample()
+            greedy = np.random.rand(num_envs) > self.epsilon
+            if greedy.any():
+                actions[greedy] = self.policy.act_batch(states[greedy])
+
+            # Take actions and get rewards
+            new_states, rewards, terminated, truncated, infos = self.env.step(actions)
+            done = terminated | truncated
+
+            # Store the final observations of the envs that are reset
+            next_states = new_states.copy()
+            for i in indices[done]:
+                next_states[i] = infos["final_observation"][i]
+
+            finished = []
+            bullet_lifetimes = np.zeros(num_envs, dtype=np.int64)
+            for i in indices:
+                info = infos["final_info"][i] if done[i] else \
+                    {key: value[i] for key, value in infos.items() if not key.startswith("_")}
+                bullet_lifetimes[i] = info["bullet lifetime"]
+
+                total_training_rewards[i] += rewards[i]
+                if done[i]:
+                    finished.append((total_training_rewards[i], info))
+                    total_training_rewards[i] = 0
+
+            # Smooth and credit the rewards, and store the transitions whose
+            # rewards are final in replay memory
+            processor.step_batch(states, actions, rewards, next_states, terminated, done,
+                                 bullet_lifetimes)
+
+            # Train as often as with a single env
+            if (self.steps_to_update_target_model // self.train_target_steps >
+                    steps_before // self.train_target_steps or done.any()):
+                self._train(terminated.any())
+
+            states = new_states
+
+            for total_training_reward, info in finished:
+                if (self.episode < self.train_episodes or self.fast) and running:
+                    self.episode += 1
+                    running = self._finish_episode(total_training_reward, info)
+                    self._next_episode()
+
+    def _run_distributed(self, time_intvl: int) -> None:
+        """
+        An internal function that trains the models as the learner of actor
+        processes. The actors play with their own epsilons and copies of
+        the policy, and stream their transitions and the results of their 
+        episodes through rings in shared memory. The learner stores the 
+        transitions in replay memory, trains as often as with a single env 
+        and shares the new weights with the actors regularly.
+        """
+
+        # Start the actors in fresh processes instead of forking the learner,
+        # whose TensorFlow runtime is not safe to fork
+        ctx = mp.get_context("spawn")
+        broadcast = WeightBroadcast(self.main_model.get_weights(), ctx)
+        stop = ctx.Event()
+
+        state_dtype = self.replay_memory.states.dtype
+        columns = transition_columns(self.state_shape, state_dtype)
+
+        # Spread the epsilons of the actors from 0.4 down to 0.4 ** 8, so
+        # that some actors explore while the others exploit
+        actors, rings = [], []
+        for i in range(self.actors):
+            epsilon = 0.4 ** (1 + 7 * i / max(self.actors - 1, 1))
+            seed = None if self.seed is None else self.seed + i
+            transitions = SharedRing(self.actor_ring_size, columns, ctx)
+            episodes = SharedRing(self.actor_ring_size // 64, episode_columns, ctx)
+            actor = ctx.Process(
+                target=run_actor,
+                args=(self.make_env_fn, seed, epsilon, time_intvl,
+                      self.policy.activations, broadcast, transitions, episodes, stop),
+                daemon=True,
+            )
+            actor.start()
+            actors.append(actor)
+            rings.append((transitions, episodes))
+
+        received = trained = updates = 0
+        running = True
+        while (self.episode < self.train_episodes or self.fast) and running:
+            # Train once per train_target_steps received transitions
+            can_train = trained < received // self.train_target_steps
+            if can_train:
+                # Only share weights that have changed, and not after every update
+                if self._train(False):
+                    updates += 1
+                    if updates % self.publish_weights_steps == 0:
+                        broadcast.publish(self.main_model.get_weights())
+                trained += 1
+
+            finished = []
+            idle = not can_train
+            for transitions, episodes in rings:
+                # Read the results of episodes before the transitions, so that
+                # the transitions of every finished episode are stored first
+                results = episodes.get()
+
+                chunk = transitions.get()
+                if chunk is not None:
+                    self.replay_memory.extend(chunk["states"], chunk["actions"], chunk["rewards"],
+                                              chunk["new_states"], chunk["terminated"])
+                    received += len(chunk["actions"])
+                    self.steps_to_update_target_model += len(chunk["actions"])
+                    idle = False
+
+                if results is not None:
+                    finished.extend(zip(*(results[name].tolist() for name in episode_columns)))
+                    idle = False
+
+            # Wait for the actors if there is nothing to do
+            if idle:
+                sleep(0.001)
+
+            for total_training_rewards, score, steps, epsilon in finished:
+                if (self.episode < self.train_episodes or self.fast) and running:
+                    self.episode += 1
+                    self.epsilon = epsilon
+                    running = self._finish_episode(total_training_rewards,
+                                                   {"score": score, "steps": steps})
+                    self._next_episode()
+
+        # Stop the actors, which stop waiting for space in the rings
+        stop.set()
+        for actor in actors:
+            actor.join()
+
+    def _finish_episode(self, total_training_rewards: float, info: dict) -> bool:
+        """
+        An internal function that records, saves and prints the result of 
+        an episode, and returns whether the training continues
+        """
+
+        self.rewards.append(total_training_rewards)
+        self.epsilons.append(self.epsilon)
+        self.scores.append(info['score'])
+        self.steps.append(info['steps'])
 
-            # Garbage collection for memory leak issue
+        # Save the target model regularly
+        if self.episode % self.save_model_steps == 0 or self.episode == self.train_episodes:
+            self.save()
+        elif self.snapshot_every and self.episode % self.snapshot_every == 0:
+            self.snapshot()
+
+        # Print progress wrt time
+        time_elapsed = self._timer(self.episode)
+
+        # Print episode's training result
+        print(f"Total training reward = {total_training_rewards:<9.2f} "
+              f"at episode {self.episode:<{len(str(self.train_episodes))}d} "
+              f"with score = {info['score']:<2d}, steps = {info['steps']}")
+
+        # Copy main model's weights to target model
+        if self.steps_to_update_target_model >= self.update_target_stesp:
+            self.target_model.set_weights(self.main_model.get_weights())
+            self.steps_to_update_target_model = 0
+
+        if time_elapsed >= self.fast_minute * 60 and self.fast:
+            self.save()
+            return False
+
+        return True
+
+    def _next_episode(self) -> None:
+        """An internal function that prints and decays epsilon after an episode"""
+
+        if self.eager_train:
+            # Garbage collection for memory leak issue of predict and fit
             gc.collect()
             keras.backend.clear_session()
 
-            print("Epsilon:", self.epsilon)
-            print("=" * 80)
+        print("Epsilon:", self.epsilon)
+        print("=" * 80)
 
-            # Update epsilon
-            self.epsilon = self.min_epsilon + (self.max_epsilon - self.min_epsilon) * np.exp(-self.decay * self.episode)
+        # Update epsilon
+        self.epsilon = self.min_epsilon + (self.max_epsilon - self.min_epsilon) * np.exp(-self.decay * self.episode)
 
-        self.env.close()
-
-        print(f"Avg score: {self._average(self.scores):.2f}, Avg steps: {self._average(self.steps):.2f}")
+        # Update beta
+        self.beta = self.max_beta - (self.max_beta - self.min_beta) * np.exp(-self.decay * self.episode)
 
     def _agent(self, neurons: tuple[int]):
         learning_rate = 0.001
@@ -230,49 +458,165 @@ class RLModel:
 
         return model
 
-    def _train(self, terminated) -> None:
-        learning_rate = 0.7
-        discount_factor = 0.618
+    def _compile_train_step(self, batch_size: int):
+        """
+        An internal function that compiles the whole training update, from
+        the forward passes and the targets to the Huber loss and the Adam
+        step, into one TensorFlow graph for batches of batch_size
+        transitions. The update returns the TD errors and the loss of the
+        batch.
+        """
+
+        learning_rate = self.q_learning_rate
+        discount_factor = self.discount_factor
+
+        loss_fn = tf.keras.losses.Huber()
+        optimizer = self.main_model.optimizer
+        main_model, target_model = self.main_model, self.target_model
+
+        state_spec = tf.TensorSpec((batch_size, *self.state_shape),
+                                   tf.as_dtype(self.replay_memory.states.dtype))
+
+        @tf.function(input_signature=[
+            state_spec,
+            tf.TensorSpec((batch_size,), tf.int64),
+            tf.TensorSpec((batch_size,), tf.float32),
+            state_spec,
+            tf.TensorSpec((batch_size,), tf.bool),
+            tf.TensorSpec((batch_size,), tf.float32),
+        ])
+        def train_step(old_states, actions, rewards, new_states, terminated, sample_weight):
+            old_states = tf.cast(old_states, tf.float32)
+            new_states = tf.cast(new_states, tf.float32)
+
+            old_qs_list = main_model(old_states, training=False)
+            new_qs_list = target_model(new_states, training=False)
+
+            # Compute the targets of the whole batch, where the future
+            # Q-values are ignored for terminal transitions
+            max_future_qs = tf.where(
+                terminated, rewards,
+                rewards + discount_factor * tf.reduce_max(new_qs_list, axis=1))
+
+            # Update the Q-values of the taken actions
+            indices = tf.stack([tf.range(batch_size, dtype=tf.int64), actions], axis=1)
+            current_qs = tf.gather_nd(old_qs_list, indices)
+            td_errors = max_future_qs - current_qs
+            targets = tf.tensor_scatter_nd_update(
+                old_qs_list, indices,
+                (1 - learning_rate) * current_qs + learning_rate * max_future_qs)
+
+            # Take one Adam step on the whole batch like model.fit
+            with tf.GradientTape() as tape:
+                loss = loss_fn(targets, main_model(old_states, training=True),
+                               sample_weight=sample_weight)
+            gradients = tape.gradient(loss, main_model.trainable_variables)
+            optimizer.apply_gradients(zip(gradients, main_model.trainable_variables))
+
+            return td_errors, loss
+
+        return train_step
+
+    def _eager_train_step(self, old_states: np.ndarray, actions: np.ndarray,
+                          rewards: np.ndarray, new_states: np.ndarray,
+                          terminated_flags: np.ndarray, sample_weight: np.ndarray
+                          ) -> tuple[np.ndarray, float]:
+        """
+        An internal function that takes the same training update as the 
+        compiled training step with model.predict and model.fit, and 
+        returns the TD errors and the loss of the batch.
+        """
+
+        old_qs_list = self.main_model.predict(old_states, verbose=0)
+        new_qs_list = self.target_model.predict(new_states, verbose=0)
+
+        # Compute the targets of the whole batch, where the future Q-values
+        # are ignored for terminal transitions. Compute in float64 like
+        # the Python scalars of a per-sample loop
+        max_future_qs = np.where(
+            terminated_flags, rewards,
+            rewards + self.discount_factor * new_qs_list.max(axis=1).astype(np.float64))
+
+        # Update the Q-values of the taken actions in place, so old_qs_list
+        # becomes the targets
+        indices = np.arange(len(actions))
+        current_qs = old_qs_list[indices, actions].astype(np.float64)
+        td_errors = max_future_qs - current_qs
+        old_qs_list[indices, actions] = (1 - self.q_learning_rate) * current_qs \
+                                        + self.q_learning_rate * max_future_qs
+
+        history = self.main_model.fit(old_states, old_qs_list, sample_weight=sample_weight,
+                                      batch_size=len(actions), verbose=0, shuffle=True)
+
+        return td_errors, history.history["loss"][0]
+
+    def _train(self, terminated) -> bool:
+        """
+        An internal function that trains the main model on a batch from 
+        replay memory, and returns whether it is updated, which needs 
+        enough transitions in replay memory.
+        """
+
         batch_size = 512
         min_replay_size = 1_000
 
         if len(self.replay_memory) < min_replay_size:
-            return
+            return False
 
-        sampled_batch = random.sample(self.replay_memory, batch_size)
-        old_states = np.array([batch[0] for batch in sampled_batch])
-        old_qs_list = self.main_model.predict(old_states, verbose=0)
-        new_states = np.array([batch[3] for batch in sampled_batch])
-        new_qs_list = self.target_model.predict(new_states, verbose=0)
+        slots = self.replay_memory.sample_slots(batch_size)
+        old_states, actions, rewards, new_states, terminated_flags = self.replay_memory.batch(slots)
 
-        x, y = [], []
-        for idx, (state, action, reward, new_state, terminated) in enumerate(sampled_batch):
-            if not terminated:
-                max_future_q = reward + discount_factor * np.max(new_qs_list[idx])
-            else:
-                max_future_q = reward
+        if self.prioritized:
+            # Correct the bias of prioritized sampling
+            sample_weight = self.replay_memory.weights(slots, self.beta)
+        else:
+            sample_weight = np.ones(batch_size)
+
+        if self.eager_train:
+            td_errors, _ = self._eager_train_step(old_states, actions, rewards, new_states,
+                                                  terminated_flags, sample_weight)
+        else:
+            # Compile the training update once for the whole run
+            if self.train_step is None:
+                self.train_step = self._compile_train_step(batch_size)
 
-            current_qs = old_qs_list[idx]
+            td_errors, _ = self.train_step(old_states, actions, rewards.astype(np.float32),
+                                           new_states, terminated_flags,
+                                           sample_weight.astype(np.float32))
+            td_errors = td_errors.numpy()
 
-            # Update Q-value
-            current_qs[action] = (1 - learning_rate) * current_qs[action] \
-                                 + learning_rate * max_future_q
+        if self.prioritized:
+            # Reprioritize the sampled transitions by their TD errors
+            self.replay_memory.update_priorities(slots, td_errors)
 
-            x.append(state)
-            y.append(current_qs)
+        # Refresh the weights cached by the policy
+        self.policy.set_weights(self.main_model.get_weights())
 
-        self.main_model.fit(np.array(x), np.array(y), batch_size=batch_size, verbose=0, shuffle=True)
+        return True
 
     def save(self) -> None:
-        """A method that saves the target model."""
+        """
+        A method that saves the target model in the background, which
+        returns once its weights are copied.
+        """
 
         # Update self.last_datetime
         self.last_datetime = datetime.now().strftime("%Y%m%d-%H%M%S")
 
-        # Save the target model
-        self.target_model.save(f"models/model_d_{self.difficulty}_"
-                               f"{'fast_' if self.fast else ''}e_"
-                               f"{self.episode:0>{len(str(self.train_episodes))}d}_{self.last_datetime}.h5")
+        # Save the target model, and export its weights for loading without TensorFlow
+        path = (f"models/model_d_{self.difficulty}_"
+                f"{'fast_' if self.fast else ''}e_"
+                f"{self.episode:0>{len(str(self.train_episodes))}d}_{self.last_datetime}")
+        self.checkpointer.save(path, self.target_model.get_weights())
+
+    def snapshot(self) -> None:
+        """
+        A method that exports the weights of the target model in the
+        background to a .npz file that every snapshot replaces.
+        """
+
+        path = f"models/model_d_{self.difficulty}_{'fast_' if self.fast else ''}latest"
+        self.checkpointer.snapshot(path, self.target_model.get_weights())
 
     def plot(self) -> None:
         """
@@ -362,11 +706,26 @@ class RLModel:
 
 
 def main():
+    # Print the number of GPUs available. This is not done at import, as
+    # the actor processes import this module again.
+    print("Number of GPUs available: ", len(tf.config.list_physical_devices('GPU')))
+
     assert args.mode != "human_rand", "human_rand mode cannot be used here"
     assert args.seed is not None, "SEED cannot be None"
     if not args.fast:
         assert args.train_episodes > 0, "TRAIN_EPISODES must be a positive integer"
     assert args.max_steps > 0, "MAX_STEPS must be a positive integer"
+    assert args.spectate_every > 0, "SPECTATE_EVERY must be a positive integer"
+    assert args.train_envs > 0, "TRAIN_ENVS must be a positive integer"
+    assert args.actors >= 0, "ACTORS must be a non-negative integer"
+    assert args.keep_checkpoints >= 0, "KEEP_CHECKPOINTS must be a non-negative integer"
+    assert args.snapshot_every >= 0, "SNAPSHOT_EVERY must be a non-negative integer"
+    if args.actors > 0:
+        assert args.mode != "human" and not args.spectate and args.train_envs == 1, \
+            "ACTORS can only be used headless without a spectator and with one TRAIN_ENVS"
+    if args.train_envs > 1:
+        assert args.mode != "human" and not args.spectate, \
+            "Multiple TRAIN_ENVS can only be used headless without a spectator"
 
     # Make a directory to store target models if necessary
     if not os.path.isdir("models"):
@@ -376,23 +735,44 @@ def main():
     if not os.path.isdir("training_results"):
         os.mkdir("training_results")
 
-    env = gym.make(
-        "gym_tankwar/TankWar-v0",
+    make_env_fn = partial(
+        make_env,
+        max_episode_steps,
         render_mode=args.mode,
         starting_hp=args.starting_hp,
         difficulty=args.difficulty,
         episodes=args.train_episodes,
         full_enemy=args.full_enemy,
+        sim_hz=args.fps,
+        render_fps=args.render_fps,
     )
-    env = gym.wrappers.TimeLimit(env, max_episode_steps=args.max_steps)
+
+    if args.train_envs > 1:
+        # Step the envs in parallel in subprocesses, with bullet lifetimes
+        # that can be stacked into integer arrays
+        env = gym.vector.AsyncVectorEnv(
+            [lambda: StackableInfo(make_env_fn())] * args.train_envs)
+    else:
+        env = make_env_fn()
+
+    if args.spectate:
+        # Import the publisher only when needed
+        from tankwar_spectate import SpectatorPublisher
+
+        # Send snapshots to tankwar_spectate.py instead of rendering here
+        env = SpectatorPublisher(env, args.spectator_address, args.spectate_every)
 
     env.action_space.seed(args.seed)
     random.seed(args.seed)
     np.random.seed(args.seed)
     tf.random.set_seed(args.seed)
 
-    observation_space_shape = env.observation_space.shape
-    action_space_size = env.action_space.n
+    if args.train_envs > 1:
+        observation_space_shape = env.single_observation_space.shape
+        action_space_size = env.single_action_space.n
+    else:
+        observation_space_shape = env.observation_space.shape
+        action_space_size = env.action_space.n
 
     print("Shape of observation space:", observation_space_shape)
     print("Size of action space      :", action_space_size)
@@ -407,6 +787,12 @@ def main():
         args.fast,
         args.fps,
         args.seed,
+        args.prioritized,
+        args.actors,
+        make_env_fn,
+        args.keep_checkpoints,
+        args.snapshot_every,
+        args.eager_train,
     )
     my_model.run()
     my_model.plot()
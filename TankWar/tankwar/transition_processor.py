@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+from collections import deque
+
+import numpy as np
+
+from replay_memory import ReplayMemory
+
+
+class TransitionProcessor:
+    """
+    A streaming stage between envs and a replay memory that smooths the
+    rewards of transitions over a window of time_intvl steps and credits
+    the transitions whose bullets hit an enemy later. The transitions of
+    each env are held in a ring until their smoothed rewards are known,
+    and are then stored in the replay memory, so every step takes O(1)
+    time. The transitions of all envs in a step are stored at once.
+    """
+
+    def __init__(self, replay_memory: ReplayMemory, num_envs: int, time_intvl: int,
+                 shoot_reward: float = 500) -> None:
+        self.replay_memory = replay_memory
+        self.num_envs = num_envs
+        self.time_intvl = time_intvl
+        self.shoot_reward = shoot_reward
+
+        # The rings of pending transitions of each env, where the transition
+        # of step k of an episode is kept in slot (k - 1) % capacity
+        self.capacity = capacity = time_intvl + 1
+        state_shape = replay_memory.states.shape[1:]
+        state_dtype = replay_memory.states.dtype
+        self.states = np.zeros((num_envs, capacity, *state_shape), dtype=state_dtype)
+        self.actions = np.zeros((num_envs, capacity), dtype=np.int64)
+        self.rewards = np.zeros((num_envs, capacity), dtype=np.float64)
+        self.new_states = np.zeros((num_envs, capacity, *state_shape), dtype=state_dtype)
+        self.terminated = np.zeros((num_envs, capacity), dtype=bool)
+
+        # The number of steps and stored transitions of the current episode
+        # of each env, and the ids of the stored transitions in replay memory
+        self.steps = [0] * num_envs
+        self.stored = [0] * num_envs
+        self.ids = [[] for _ in range(num_envs)]
+
+        # The rewards of the last time_intvl steps of each env and their sum,
+        # and the bullet rewards of the pending transitions
+        self.reward_intervals = [deque(maxlen=time_intvl) for _ in range(num_envs)]
+        self.reward_sums = [0.0] * num_envs
+        self.reward_interval_shoots = [deque(maxlen=time_intvl) for _ in range(num_envs)]
+
+    def step(self, state: np.ndarray, action: int, reward: float, new_state: np.ndarray,
+             terminated: bool, done: bool, bullet_lifetime: int) -> None:
+        """A function that processes a step of a single env."""
+
+        # Hold the new transition in the ring
+        slot = self.steps[0] % self.capacity
+        self.states[0, slot] = state
+        self.actions[0, slot] = action
+        self.rewards[0, slot] = reward
+        self.new_states[0, slot] = new_state
+        self.terminated[0, slot] = terminated
+
+        store = []
+        self._process(0, reward, done, bullet_lifetime, store)
+        self._store_all(store)
+
+    def step_batch(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+                   new_states: np.ndarray, terminated: np.ndarray, done: np.ndarray,
+                   bullet_lifetimes: np.ndarray) -> None:
+        """
+        A function that processes a step of all envs, where done marks the
+        envs whose episodes end in this step, and a bullet lifetime of 0
+        means that no enemy is hit.
+        """
+
+        envs = np.arange(self.num_envs)
+
+        # Hold the new transitions in the rings
+        slots = np.array(self.steps) % self.capacity
+        self.states[envs, slots] = states
+        self.actions[envs, slots] = actions
+        self.rewards[envs, slots] = rewards
+        self.new_states[envs, slots] = new_states
+        self.terminated[envs, slots] = terminated
+
+        store = []
+        for i, reward, is_done, bullet_lifetime in zip(
+                envs.tolist(), rewards.tolist(), done.tolist(), bullet_lifetimes.tolist()):
+            self._process(i, reward, is_done, bullet_lifetime, store)
+        self._store_all(store)
+
+    def _process(self, i: int, reward: float, done: bool, bullet_lifetime: int,
+                 store: list[tuple[int, int, float]]) -> None:
+        """
+        An internal function that updates the bookkeeping of an env with
+        the reward of a step, and adds the env, step and final reward of
+        each transition that can be stored to store.
+        """
+
+        time_intvl = self.time_intvl
+
+        self.steps[i] += 1
+        step = self.steps[i]
+
+        reward_interval = self.reward_intervals[i]
+        reward_interval_shoot = self.reward_interval_shoots[i]
+        if len(reward_interval) == time_intvl:
+            self.reward_sums[i] -= reward_interval[0]
+        reward_interval.append(reward)
+        self.reward_sums[i] += reward
+        reward_interval_shoot.append(0)
+
+        # Credit the transition in which the bullet was shot
+        if bullet_lifetime:
+            if bullet_lifetime <= time_intvl:
+                reward_interval_shoot[-bullet_lifetime] += self.shoot_reward
+            else:
+                self._credit(i, step - bullet_lifetime + 1)
+
+        if done:
+            # Store the transitions that are never smoothed with their own
+            # rewards, and smooth the rest over the rewards that follow them
+            # in the window
+            n = len(reward_interval)
+            for k in range(self.stored[i] + 1, step - n + 1):
+                store.append((i, k, self.rewards[i, (k - 1) % self.capacity]))
+
+            reward_sum = 0.0
+            for j in range(n, 0, -1):
+                reward_sum += reward_interval[j - 1]
+                store.append((i, step - j + 1,
+                              reward_sum / (n - j + 1) + reward_interval_shoot[j - 1]))
+
+            self._reset(i)
+        elif step > time_intvl:
+            # The transition of the first step is never smoothed
+            if step == time_intvl + 1:
+                store.append((i, 1, self.rewards[i, 0]))
+
+            store.append((i, step - time_intvl + 1,
+                          self.reward_sums[i] / len(reward_interval) + reward_interval_shoot[0]))
+            self.stored[i] = step - time_intvl + 1
+
+    def _store_all(self, store: list[tuple[int, int, float]]) -> None:
+        """
+        An internal function that stores transitions in replay memory at
+        once, and records their ids for the episodes that continue.
+        """
+
+        if not store:
+            return
+
+        if len(store) == 1:
+            (i, step, reward), = store
+            slot = (step - 1) % self.capacity
+            transition_id = self.replay_memory.count
+            self.replay_memory.append(self.states[i, slot], self.actions[i, slot], reward,
+                                      self.new_states[i, slot], self.terminated[i, slot])
+            if self.steps[i] > 0:
+                self.ids[i].append(transition_id)
+            return
+
+        store_envs, store_steps, store_rewards = zip(*store)
+        store_slots = (np.array(store_steps) - 1) % self.capacity
+        ids = self.replay_memory.extend(
+            self.states[store_envs, store_slots],
+            self.actions[store_envs, store_slots],
+            np.array(store_rewards),
+            self.new_states[store_envs, store_slots],
+            self.terminated[store_envs, store_slots],
+        )
+
+        for i, transition_id in zip(store_envs, ids.tolist()):
+            if self.steps[i] > 0:
+                self.ids[i].append(transition_id)
+
+    def _credit(self, i: int, step: int) -> None:
+        """
+        An internal function that adds the bullet reward to the transition
+        of a step, whether it is pending or already stored.
+        """
+
+        if step > self.stored[i]:
+            self.rewards[i, (step - 1) % self.capacity] += self.shoot_reward
+            return
+
+        index = self.replay_memory.index(self.ids[i][step - 1])
+        if index >= -len(self.replay_memory):  # Not overwritten yet
+            self.replay_memory.add_reward(index, self.shoot_reward)
+
+    def _reset(self, i: int) -> None:
+        """An internal function that starts the bookkeeping of a new episode of an env"""
+
+        self.steps[i] = 0
+        self.stored[i] = 0
+        self.ids[i] = []
+        self.reward_intervals[i].clear()
+        self.reward_sums[i] = 0.0
+        self.reward_interval_shoots[i].clear()